@@ -7,10 +7,10 @@ of this template:
 
 1. Import necessary libraries and load the ChromaDB Client.
 2. Create or access a ChromaDB collection.
-3. Initialize lists to store documents, metadatas, and ids.
-4. Fetch documents from desired sources (Local Files, Google Drive, OneDrive, Dropbox, iCloud, Web, Databases).
-5. Add documents to the collection.
-6. Optionally query the collection to test the integration.
+3. Define source connectors that produce (id, document, metadata) records
+   (Local Files, Google Drive, OneDrive, Dropbox, iCloud, Web, Databases).
+4. Fetch from the enabled sources concurrently and stream the records into the collection in size-bounded batches.
+5. Optionally query the collection to test the integration.
 
 Each data source section includes optional alternatives for credential management using .env files or Key Vault Managers like 
 Google Vault, AWS Key Management Services, Azure Key Vault, Hashicorp Vault, etc. Uncomment and configure the section(s) that 
@@ -24,9 +24,10 @@ Before proceeding, ensure you have installed and imported the necessary packages
 - Other libraries as needed based on your document sources and credential management choices
 
 The current structure of the script allows for pulling data from multiple sources simultaneously, as long as the corresponding 
-sections are uncommented and properly configured. Each section is independent, so you can activate as many or as few as needed 
-for your use case. The script will iterate through each enabled section, fetching and appending documents, metadatas, and ids 
-to their respective lists before adding them all to the ChromaDB collection at once.
+sources are listed in `sources` near the end of the script and properly configured. Each source is an independent connector, and the 
+enabled connectors are fetched concurrently on a bounded thread pool, so you can activate as many or as few as needed for your use case. Records are grouped into batches bounded by record count and document 
+size, and each batch is added to the ChromaDB collection as soon as it is full. Peak memory therefore stays at roughly one batch, 
+and a failing batch is reported on its own instead of failing the whole load.
 
 Incorporating Key Vault Managers can enhance security by managing sensitive information like credentials and API keys. Below is 
 a version of the script that includes a generic template for integrating Key Vault Managers. You would need to install 
@@ -44,28 +45,1099 @@ and it may require additional steps not covered in this template.
 # Instructional section for the USER
 # Here, you would provide detailed instructions about the script's intentions, usage, and how to configure each section. This should include the example schema and discussions on key management options.
 
+import atexit
 import chromadb
+import cProfile
+import hashlib
+import io
+import itertools
+import json
+import logging
 import os
+import pstats
+import re
+import signal
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from chromadb.utils import embedding_functions
 
 # Load the environment variables from the .env file (if using .env approach)
 from dotenv import load_dotenv
 
 # Import additional libraries as needed based on your document source and key management strategy
 
-# Load your ChromaDB Client
-chroma_client = chromadb.Client()
+# Set up basic logging to track the flow of operations and debug issues
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Create or access your collection
+# Storage mode: a persistent client keeps the collection on disk between runs, so a restart can query it
+# immediately instead of re-ingesting. Set CHROMA_PERSISTENT = False for a throwaway in-memory collection.
+CHROMA_PERSISTENT = True
+CHROMA_PERSIST_PATH = os.getenv('CHROMA_PERSIST_PATH', "chroma_data")  # Replace with your storage directory or use .env
+INGEST_VERSION = "1"  # Bump to force a full re-ingest on the next start
+
+# Persistent embedding cache: documents and queries whose text was embedded before (by the same model) are served
+# from disk instead of being embedded again. Least recently used entries are evicted beyond the size limit.
+EMBEDDING_CACHE_ENABLED = True
+EMBEDDING_CACHE_PATH = "embedding_cache.sqlite3"
+EMBEDDING_CACHE_MAX_BYTES = 1024 * 1024 * 1024  # 1 GiB of stored embeddings
+EMBEDDING_CACHE_TOUCH_BATCH = 1000  # Cache hits whose last-used time is kept in memory before being written out
+
+# Stage timings and counters (see Pipeline Metrics below). The embed stage is timed inside the embedding cache, so
+# with EMBEDDING_CACHE_ENABLED = False embedding time is included in the upsert and search stages instead.
+METRICS_NAMESPACE = "chroma_integration"
+METRICS_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRICS_EXPORT_PATH = os.getenv('METRICS_EXPORT_PATH')  # Prometheus text file written at exit; None to skip
+METRICS_PORT = int(os.getenv('METRICS_PORT', "0"))  # Serve http://localhost:<port>/metrics; 0 to disable
+METRICS_HOST = "127.0.0.1"  # Interface the metrics endpoint binds to; "0.0.0.0" exposes it to the network
+PROFILE_ENABLED = os.getenv('PROFILE_ENABLED') == "1"  # Run cProfile from startup
+PROFILE_SIGNAL = True  # SIGUSR1 toggles cProfile while the script runs (POSIX only)
+PROFILE_OUTPUT_PATH = "chroma_profile.pstats"
+
+# ---------------------------
+# Pipeline Metrics
+# ---------------------------
+# Timings and item counts for the fetch, chunk, embed, upsert and search stages. Each call wrapped in
+# pipeline_metrics.timed(stage, items) lands in that stage's latency histogram and item counter, and a call that
+# raises also counts as an error. Free-form counters (e.g. embedding cache hits) are kept alongside. Everything is exported in the Prometheus text format,
+# either to a file (e.g. for node_exporter's textfile collector) or on an HTTP /metrics endpoint.
+# cProfile can be switched on and off while the process runs, from code or with SIGUSR1 on POSIX systems.
+# It profiles the thread that switches it on (every thread on Python 3.12+).
+
+class PipelineMetrics:
+    """
+    Thread-safe per-stage latency histograms and counters.
+    :param namespace: Prefix of the exported metric names
+    :param buckets: Upper bounds of the latency histogram buckets, in seconds
+    """
+
+    def __init__(self, namespace, buckets=METRICS_LATENCY_BUCKETS):
+        self.namespace = namespace
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._stages = {}  # stage -> {"buckets": per-bucket counts, "count", "sum", "items", "errors"}
+        self._counters = {}
+        self._profiler = None
+
+    def observe(self, stage, seconds, items=0, error=False):
+        """
+        Record one call of a stage.
+        """
+        with self._lock:
+            data = self._stages.setdefault(
+                stage, {"buckets": [0] * len(self.buckets), "count": 0, "sum": 0.0, "items": 0, "errors": 0})
+            for position, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    data["buckets"][position] += 1
+                    break
+            data["count"] += 1
+            data["sum"] += seconds
+            data["items"] += items
+            data["errors"] += int(error)
+
+    @contextmanager
+    def timed(self, stage, items=0):
+        """
+        Time the enclosed block as one call of a stage.
+        :param stage: Stage name (fetch, chunk, embed, upsert, search)
+        :param items: Items handled by the call; set call["items"] inside the block when only known afterwards
+        :return: Context manager yielding the call dict, which holds "seconds" after the block
+        """
+        call = {"items": items, "seconds": 0.0}
+        started = time.perf_counter()
+        try:
+            yield call
+        except Exception:
+            call["seconds"] = time.perf_counter() - started
+            self.observe(stage, call["seconds"], call["items"], error=True)
+            raise
+        call["seconds"] = time.perf_counter() - started
+        self.observe(stage, call["seconds"], call["items"])
+
+    def count(self, counter, amount=1):
+        """
+        Add to a free-form counter, exported as <namespace>_<counter>_total.
+        """
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + amount
+
+    def snapshot(self):
+        """
+        Return a copy of the stage data (with calls, mean_ms and items_per_sec added) and the counters.
+        """
+        with self._lock:
+            stages = {stage: dict(data, buckets=list(data["buckets"])) for stage, data in self._stages.items()}
+            counters = dict(self._counters)
+        for data in stages.values():
+            data["mean_ms"] = data["sum"] / data["count"] * 1000 if data["count"] else 0.0
+            data["items_per_sec"] = data["items"] / data["sum"] if data["sum"] else 0.0
+        return {"stages": stages, "counters": counters}
+
+    def log_summary(self):
+        """
+        Log one line per stage with its calls, items, errors and timings.
+        """
+        for stage, data in sorted(self.snapshot()["stages"].items()):
+            logging.info(f"Stage '{stage}': {data['count']} calls, {data['items']} items, {data['errors']} errors, "
+                         f"{data['sum']:.2f}s total, {data['mean_ms']:.2f} ms/call, "
+                         f"{data['items_per_sec']:.0f} items/sec.")
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+    def to_prometheus(self):
+        """
+        Render the metrics in the Prometheus text exposition format.
+        :return: String
+        """
+        snapshot = self.snapshot()
+        name = f"{self.namespace}_stage"
+        lines = [f"# HELP {name}_duration_seconds Time per call of each pipeline stage.",
+                 f"# TYPE {name}_duration_seconds histogram"]
+        for stage, data in sorted(snapshot["stages"].items()):
+            cumulative = 0
+            for bound, observed in zip(self.buckets, data["buckets"]):
+                cumulative += observed
+                lines.append(f'{name}_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_duration_seconds_bucket{{stage="{stage}",le="+Inf"}} {data["count"]}')
+            lines.append(f'{name}_duration_seconds_sum{{stage="{stage}"}} {data["sum"]}')
+            lines.append(f'{name}_duration_seconds_count{{stage="{stage}"}} {data["count"]}')
+        for field, description in (("items", "Items processed by each pipeline stage."),
+                                   ("errors", "Calls of each pipeline stage that raised an error.")):
+            lines.append(f"# HELP {name}_{field}_total {description}")
+            lines.append(f"# TYPE {name}_{field}_total counter")
+            for stage, data in sorted(snapshot["stages"].items()):
+                lines.append(f'{name}_{field}_total{{stage="{stage}"}} {data[field]}')
+        for counter, value in sorted(snapshot["counters"].items()):
+            lines.append(f"# TYPE {self.namespace}_{counter}_total counter")
+            lines.append(f"{self.namespace}_{counter}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """
+        Atomically write the metrics to a file in the Prometheus text format.
+        :param path: Output file (e.g. in node_exporter's textfile collector directory)
+        """
+        with open(path + ".tmp", "w") as file:
+            file.write(self.to_prometheus())
+        os.replace(path + ".tmp", path)
+
+    def serve(self, port, host=METRICS_HOST):
+        """
+        Serve the metrics on http://host:port/metrics from a background thread.
+        :return: The ThreadingHTTPServer (call shutdown() to stop it)
+        """
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        logging.info(f"Serving metrics on http://{host}:{port}/metrics")
+        return server
+
+    def start_profiling(self):
+        """
+        Start collecting a cProfile profile (no-op when one is already running).
+        """
+        if self._profiler is None:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+            logging.info("Profiling started.")
+
+    def stop_profiling(self, path=PROFILE_OUTPUT_PATH, top=20):
+        """
+        Stop profiling, write the stats for pstats/snakeviz and log the most expensive functions.
+        :param path: Output .pstats file
+        :param top: Number of functions to log, by cumulative time
+        """
+        if self._profiler is None:
+            return
+        self._profiler.disable()
+        profiler, self._profiler = self._profiler, None
+        profiler.dump_stats(path)
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(top)
+        logging.info(f"Profiling stopped; stats written to {path}.\n{summary.getvalue()}")
+
+    def toggle_profiling(self, *_):
+        """
+        Start profiling, or stop it and write the stats; usable as a signal handler.
+        """
+        if self._profiler is None:
+            self.start_profiling()
+        else:
+            self.stop_profiling()
+
+pipeline_metrics = PipelineMetrics(METRICS_NAMESPACE)
+
+def start_metrics_exporters():
+    """
+    Start the configured profiling, SIGUSR1 toggle, /metrics endpoint and exit-time file export.
+    Called from the main section only, so importing the script (including from worker processes, which
+    re-import it under the spawn start method) never binds the port or writes the metrics file.
+    """
+    if PROFILE_ENABLED:
+        pipeline_metrics.start_profiling()
+    if PROFILE_SIGNAL and hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGUSR1, pipeline_metrics.toggle_profiling)  # `kill -USR1 <pid>` toggles profiling
+    if METRICS_PORT:
+        pipeline_metrics.serve(METRICS_PORT)
+    if METRICS_EXPORT_PATH:
+        atexit.register(pipeline_metrics.write_prometheus, METRICS_EXPORT_PATH)
+
+# ---------------------------
+# Embedding Cache
+# ---------------------------
+# Wraps the collection's embedding function. Entries are keyed by (embedding model, sha256 of the text), so
+# duplicate documents across sources and repeated query texts are embedded only once, across runs.
+
+class CachedEmbeddingFunction(embedding_functions.EmbeddingFunction):
+    """
+    Embedding function that consults an on-disk SQLite cache before calling the wrapped function.
+    :param embedding_function: The embedding function to wrap
+    :param cache_path: SQLite file holding the cache
+    :param max_bytes: Total size of stored embeddings before least recently used entries are evicted
+    :param model: Cache namespace; derived from the wrapped function's name and config when omitted
+    :param touch_batch: Hits whose last-used time is buffered in memory before one write, so a hit costs no commit
+    """
+
+    def __init__(self, embedding_function, cache_path=EMBEDDING_CACHE_PATH, max_bytes=EMBEDDING_CACHE_MAX_BYTES,
+                 model=None, touch_batch=EMBEDDING_CACHE_TOUCH_BATCH):
+        self.embedding_function = embedding_function
+        self.max_bytes = max_bytes
+        self.touch_batch = touch_batch
+        self._touched = {}  # key -> last-used time not yet written to the database
+        self.model = model or self._model_name(embedding_function)
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(cache_path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL, "
+                         "size INTEGER NOT NULL, last_used REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+        atexit.register(self.flush)
+
+    @staticmethod
+    def _model_name(embedding_function):
+        try:
+            return f"{embedding_function.name()}:{json.dumps(embedding_function.get_config(), sort_keys=True)}"
+        except Exception:
+            return type(embedding_function).__name__
+
+    # Collections persist the wrapped function's name, config and distance space, so a reopened collection
+    # stays compatible and gets the same space defaults as the unwrapped function
+    def name(self):
+        return self.embedding_function.name()
+
+    def get_config(self):
+        return self.embedding_function.get_config()
+
+    def default_space(self):
+        return self.embedding_function.default_space()
+
+    def supported_spaces(self):
+        return self.embedding_function.supported_spaces()
+
+    def is_legacy(self):
+        return self.embedding_function.is_legacy()
+
+    def validate_config_update(self, old_config, new_config):
+        return self.embedding_function.validate_config_update(old_config, new_config)
+
+    def __call__(self, input):
+        return self._embed(input, self.embedding_function, "document")
+
+    def embed_query(self, input):
+        return self._embed(input, self.embedding_function.embed_query, "query")
+
+    def _embed(self, texts, embed, kind):
+        keys = [f"{self.model}|{kind}|{hashlib.sha256(text.encode()).hexdigest()}" for text in texts]
+        found = self._lookup(set(keys))
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)  # Duplicates within one call are embedded once
+        if missing:
+            with pipeline_metrics.timed("embed", len(missing)):
+                vectors = embed(list(missing.values()))
+            computed = dict(zip(missing, (np.asarray(vector, dtype=np.float32) for vector in vectors)))
+            self._store(computed)
+            found.update(computed)
+        with self._lock:
+            self.stats["hits"] += len(keys) - len(missing)
+            self.stats["misses"] += len(missing)
+        pipeline_metrics.count("embedding_cache_hits", len(keys) - len(missing))
+        return [found[key] for key in keys]
+
+    def _lookup(self, keys):
+        found = {}
+        keys = list(keys)
+        now = time.time()
+        with self._lock:
+            for start in range(0, len(keys), 500):  # Stay below SQLite's bound-parameter limit
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for key, vector in self._db.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk):
+                    found[key] = np.frombuffer(vector, dtype=np.float32)
+                    self._touched[key] = now
+            if len(self._touched) >= self.touch_batch:
+                self._write_touched()
+                self._db.commit()
+        return found
+
+    def _write_touched(self):
+        # Caller holds the lock; writes the buffered last-used times in one statement batch
+        if self._touched:
+            self._db.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?",
+                                 [(last_used, key) for key, last_used in self._touched.items()])
+            self._touched.clear()
+
+    def flush(self):
+        """
+        Write buffered last-used times to the database.
+        """
+        with self._lock:
+            self._write_touched()
+            self._db.commit()
+
+    def _store(self, vectors):
+        now = time.time()
+        with self._lock:
+            self._write_touched()  # Eviction below orders by last_used, so it must see recent hits
+            rows = [(key, vector.tobytes(), vector.nbytes, now) for key, vector in vectors.items()]
+            self._db.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+            self._total_bytes += sum(row[2] for row in rows)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        # Drop least recently used entries until the cache is back under 90% of its limit
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        for key, size in self._db.execute("SELECT key, size FROM embeddings ORDER BY last_used").fetchall():
+            if self._total_bytes <= target:
+                break
+            self._db.execute("DELETE FROM embeddings WHERE key = ?", (key,))
+            self._total_bytes -= size
+            evicted += 1
+        self.stats["evictions"] += evicted
+        logging.info(f"Evicted {evicted} cached embeddings.")
+
+    def hit_rate(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+# ---------------------------
+# Client and Collection Setup
+# ---------------------------
+# The client, embedding function and collection are created on first use rather than at import time, so
+# chunking worker processes (which re-import this script) never open the database, load the model or the cache.
 collection_name = "your_collection_name"  # Replace with your actual collection name
-try:
-    collection = chroma_client.create_collection(name=collection_name)
-except:
-    collection = chroma_client.get_collection(name=collection_name)
+_chroma_client = None
+_embedding_function = None
+
+def get_chroma_client():
+    """
+    Return the shared ChromaDB client (persistent or in-memory, see CHROMA_PERSISTENT), creating it on first use.
+    :return: ChromaDB client instance
+    """
+    global _chroma_client
+    if _chroma_client is None:
+        if CHROMA_PERSISTENT:
+            _chroma_client = chromadb.PersistentClient(path=CHROMA_PERSIST_PATH)
+        else:
+            _chroma_client = chromadb.Client()
+    return _chroma_client
+
+def get_embedding_function():
+    """
+    Return the shared embedding function for the collection, creating it on first use.
+    Replace the default with your preferred model if needed; it is wrapped in the disk cache when enabled.
+    :return: Embedding function instance
+    """
+    global _embedding_function
+    if _embedding_function is None:
+        _embedding_function = embedding_functions.DefaultEmbeddingFunction()
+        if EMBEDDING_CACHE_ENABLED:
+            _embedding_function = CachedEmbeddingFunction(_embedding_function)
+    return _embedding_function
+
+def get_collection(name=collection_name):
+    """
+    Create or access a collection using the shared client and embedding function.
+    :param name: Name of the collection
+    :return: ChromaDB collection
+    """
+    return get_chroma_client().get_or_create_collection(name=name, embedding_function=get_embedding_function())
+
+# Batch limits for streaming ingestion: a batch is added once either limit is reached
+ADD_BATCH_SIZE = 256  # Maximum records per collection.add call
+ADD_BATCH_BYTES = 8 * 1024 * 1024  # Maximum total document size per batch, in bytes
+
+# Concurrent fetching: sources are read by a shared thread pool with at most FETCH_MAX_IN_FLIGHT items pending
+FETCH_WORKERS = 8  # Threads fetching documents from all sources
+FETCH_MAX_IN_FLIGHT = 32  # Fetched-but-not-ingested items before fetching pauses
+FETCH_TIMEOUT = 30  # Seconds before a single network fetch is abandoned
+HTTP_POOL_SIZE = 16  # Pooled keep-alive connections per host for the web source
+# Chunking: documents are split before embedding so large files become several focused embeddings
+CHUNKING_ENABLED = True
+CHUNK_STRATEGY = "sentence"  # "fixed" (fixed-size windows) or "sentence" (sentence-aware packing)
+CHUNK_SIZE = 1000  # Target characters per chunk
+CHUNK_OVERLAP = 200  # Characters shared by consecutive chunks
+CHUNK_WORKERS = os.cpu_count() or 1  # Processes splitting documents; 1 splits in the calling process
+QUERY_BATCH_SIZE = 32  # Queries sent per collection.query call; larger batches raise throughput but also per-call latency
+QUERY_N_RESULTS = 5  # Results returned per query
+DB_FETCH_SIZE = 1000  # Rows fetched from the database cursor per round-trip
+DB_CHECKPOINT_PATH = "database_ingest_checkpoint.json"  # Last ingested id per table, for resuming database loads
+LOCAL_FILES_MANIFEST = "local_files_manifest.json"  # path -> [size, mtime_ns, sha256] of ingested local files
+
+# ---------------------------
+# Streaming Ingestion
+# ---------------------------
+# Every source below is a generator yielding (id, document, metadata) records. The records are grouped into
+# size-bounded batches and each batch is added as soon as it is ready, so only one batch is held in memory.
+# Records that cannot be stored (e.g. a NULL document) are set aside and reported instead of stopping the load.
+
+def coerce_record(record):
+    """
+    Check one record before it is batched, decoding byte documents and turning ids into strings.
+    :param record: (id, document, metadata) tuple
+    :return: (record, None) when the record can be stored, otherwise (original record, error message)
+    """
+    try:
+        record_id, document, metadata = record
+    except (TypeError, ValueError):
+        return record, f"expected an (id, document, metadata) tuple, got {type(record).__name__}"
+    if record_id is None:
+        return record, "record has no id"
+    if isinstance(document, bytes):
+        document = _as_text(document)
+    if not isinstance(document, str):
+        return record, f"document is {type(document).__name__}, not text"
+    if metadata is not None and not isinstance(metadata, dict):
+        return record, f"metadata is {type(metadata).__name__}, not a dict"
+    return (str(record_id), document, metadata), None
+
+def iter_batches(records, max_records=ADD_BATCH_SIZE, max_bytes=ADD_BATCH_BYTES):
+    """
+    Group (id, document, metadata) records into batches bounded by record count and document size.
+    :param records: Iterable of (id, document, metadata) tuples
+    :param max_records: Maximum records per batch
+    :param max_bytes: Maximum total document size per batch
+    :return: Generator of lists of records
+    """
+    batch, batch_bytes = [], 0
+    for record in records:
+        record_bytes = len(record[1])
+        if batch and (len(batch) >= max_records or batch_bytes + record_bytes > max_bytes):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(record)
+        batch_bytes += record_bytes
+    if batch:
+        yield batch
+
+def add_batch(collection, batch, upsert=False):
+    """
+    Add one batch of records to the collection.
+    :param collection: ChromaDB collection
+    :param batch: List of (id, document, metadata) tuples
+    :param upsert: Overwrite records whose ids already exist instead of failing
+    """
+    batch_ids, batch_documents, batch_metadatas = zip(*batch)
+    write = collection.upsert if upsert else collection.add
+    with pipeline_metrics.timed("upsert", len(batch)):
+        write(documents=list(batch_documents), metadatas=list(batch_metadatas), ids=list(batch_ids))
+
+def ingest_records(collection, records, max_records=ADD_BATCH_SIZE, max_bytes=ADD_BATCH_BYTES, upsert=False):
+    """
+    Stream records into the collection batch by batch, reporting failures per batch.
+    :param collection: ChromaDB collection
+    :param records: Iterable of (id, document, metadata) tuples
+    :param max_records: Maximum records per batch
+    :param max_bytes: Maximum total document size per batch
+    :param upsert: Overwrite records whose ids already exist instead of failing
+    :return: List of per-batch results with batch number, record count, first/last id and error (None on success);
+             failed batches also list their ids under "failed_ids". Each record rejected by coerce_record() is
+             reported as its own failed entry with batch None.
+    """
+    report = []
+    invalid = []
+
+    def valid(records):
+        for record in records:
+            record, error = coerce_record(record)
+            if error is None:
+                yield record
+                continue
+            record_id = record[0] if isinstance(record, tuple) and record else None
+            invalid.append({"batch": None, "records": 1, "first_id": record_id, "last_id": record_id,
+                            "error": error, "failed_ids": [record_id] if record_id is not None else []})
+            logging.error(f"Skipped record {record_id!r}: {error}")
+
+    for number, batch in enumerate(iter_batches(valid(records), max_records, max_bytes)):
+        result = {"batch": number, "records": len(batch), "first_id": batch[0][0], "last_id": batch[-1][0],
+                  "error": None}
+        try:
+            add_batch(collection, batch, upsert)
+        except Exception as e:
+            result["error"] = str(e)
+            result["failed_ids"] = [record[0] for record in batch]
+            logging.error(f"Batch {number} ({result['first_id']} .. {result['last_id']}) failed: {e}")
+        report.append(result)
+    added = sum(result["records"] for result in report if result["error"] is None)
+    failed = [result["batch"] for result in report if result["error"] is not None]
+    logging.info(f"Added {added} records in {len(report)} batches ({len(failed)} failed, "
+                 f"{len(invalid)} invalid records skipped).")
+    return report + invalid
+
+# ---------------------------
+# Warm Start
+# ---------------------------
+# After a successful ingest, a fingerprint of the configured sources, chunking settings and INGEST_VERSION is
+# stored next to the persistent collection together with the ids those sources wrote. On the next start the ingest
+# is skipped when the fingerprint matches and all of those ids are still stored, so the first query is served
+# straight from disk. A source whose fingerprint() returns None cannot tell whether its contents changed, so the
+# ingest always runs when it is configured. The stored ids also mark which records the configured sources own:
+# a re-ingest only removes those, never records written by sync_local_files() or ingest_database().
+
+def ingest_fingerprint(sources):
+    """
+    Hash everything that determines the collection's contents.
+    :param sources: List of SourceConnector instances
+    :return: Hex digest, or None when a source cannot fingerprint its contents
+    """
+    digest = hashlib.sha256(json.dumps([INGEST_VERSION, CHUNKING_ENABLED, CHUNK_STRATEGY, CHUNK_SIZE, CHUNK_OVERLAP]).encode())
+    for source in sources:
+        source_fingerprint = source.fingerprint()
+        if source_fingerprint is None:
+            logging.info(f"Source '{source.name}' cannot report content changes; warm start disabled.")
+            return None
+        digest.update(source_fingerprint.encode())
+    return digest.hexdigest()
+
+def _warm_start_path(collection):
+    return os.path.join(CHROMA_PERSIST_PATH, f"{collection.name}.ingest.json")
+
+def load_warm_start_state(collection):
+    """
+    Read the stored warm-start state.
+    :return: Dict with fingerprint (None after an incomplete ingest) and ids, or None when nothing is stored
+    """
+    if not CHROMA_PERSISTENT or not os.path.exists(_warm_start_path(collection)):
+        return None
+    with open(_warm_start_path(collection)) as file:
+        return json.load(file)
+
+def save_warm_start_state(collection, fingerprint, ids):
+    """
+    Record the fingerprint the collection now reflects (None when it is not current) and the ids the sources own.
+    """
+    if CHROMA_PERSISTENT:
+        tmp_path = _warm_start_path(collection) + ".tmp"
+        with open(tmp_path, "w") as file:
+            json.dump({"fingerprint": fingerprint, "ids": sorted(ids)}, file)
+        os.replace(tmp_path, _warm_start_path(collection))
+
+def collection_is_current(collection, fingerprint):
+    """
+    Check whether the stored collection was built from the same sources and still holds all of their records.
+    Always False for the in-memory client and when there is no fingerprint.
+    """
+    state = load_warm_start_state(collection)
+    if fingerprint is None or state is None or state["fingerprint"] != fingerprint:
+        return False
+    ids = state.get("ids", [])
+    for start in range(0, len(ids), ADD_BATCH_SIZE):
+        batch = ids[start:start + ADD_BATCH_SIZE]
+        if len(collection.get(ids=batch, include=[])["ids"]) != len(batch):
+            return False
+    return True
+
+def prune_collection(collection, ids):
+    """
+    Delete the given records.
+    :param collection: ChromaDB collection
+    :param ids: Ids to delete
+    :return: Number of deleted records
+    """
+    ids = list(ids)
+    for start in range(0, len(ids), ADD_BATCH_SIZE):
+        collection.delete(ids=ids[start:start + ADD_BATCH_SIZE])
+    return len(ids)
+
+def rebuild_collection(collection, sources, fingerprint, chunking=CHUNKING_ENABLED):
+    """
+    Re-ingest every source and remove what the sources no longer contain: the old chunks of each fetched document
+    are deleted before its new chunks are upserted, and ids the sources wrote on an earlier run but not on this one
+    (documents that left a source) are dropped afterwards. Records from anywhere else are never touched. Pruning
+    only happens when every fetch and batch succeeded, so a failed run keeps the previous records and is retried
+    on the next start. Connectors with a manifest skip unchanged items and are refused; use sync_local_files().
+    :param collection: ChromaDB collection
+    :param sources: List of SourceConnector instances
+    :param fingerprint: ingest_fingerprint(sources)
+    :param chunking: Split documents into chunks (see Chunking)
+    :return: ingest_records report
+    """
+    if not sources:
+        logging.info("No sources configured; nothing to ingest.")
+        return []
+    incremental = [source.name for source in sources if getattr(source, "manifest_path", None)]
+    if incremental:
+        raise ValueError(f"Sources {incremental} only fetch changed items; sync them with sync_local_files() instead")
+    failed_fetches = []
+    written_ids = set()
+
+    def track(records):
+        for record in records:
+            written_ids.add(record[0])
+            yield record
+
+    records = fetch_concurrently(sources, failed=failed_fetches)
+    if chunking:
+        records = chunk_records(replace_chunks(collection, records))
+    report = ingest_records(collection, track(records), upsert=CHROMA_PERSISTENT)
+    owned_ids = set((load_warm_start_state(collection) or {}).get("ids", []))
+    written_ids.difference_update(record_id for result in report if result["batch"] is None
+                                  for record_id in result["failed_ids"])  # Invalid records were never stored
+    if failed_fetches or any(result["error"] is not None and result["batch"] is not None for result in report):
+        logging.warning(f"Ingest of '{collection.name}' incomplete; keeping stale records until the next start.")
+        save_warm_start_state(collection, None, written_ids | owned_ids)  # Still owned by the sources
+        return report
+    removed = prune_collection(collection, owned_ids - written_ids)
+    if removed:
+        logging.info(f"Removed {removed} records no longer present in the sources.")
+    save_warm_start_state(collection, fingerprint, written_ids)
+    return report
+
+def benchmark_startup(sizes=(10_000, 100_000, 1_000_000), dimensions=384, path=None, batch_size=5000):
+    """
+    Measure cold versus warm time to first query for persistent collections of several sizes.
+    Cold: open a fresh store, add all records and run a query. Warm: reopen the stored collection and run a query.
+    Random precomputed embeddings are used so the numbers reflect storage and indexing, not the embedding model.
+    :param sizes: Collection sizes to measure
+    :param dimensions: Embedding dimensions
+    :param path: Directory for the benchmark stores (a temporary directory, removed afterwards, when omitted)
+    :param batch_size: Records per add call during the cold start
+    :return: List of dicts with documents, cold_seconds and warm_seconds
+    """
+    import shutil
+    import tempfile
+    from chromadb.api.client import SharedSystemClient
+    root = path or tempfile.mkdtemp(prefix="chroma_startup_")
+    rng = np.random.default_rng(0)
+    query = rng.random((1, dimensions), dtype=np.float32)
+    report = []
+    try:
+        for size in sizes:
+            store = os.path.join(root, f"store_{size}")
+            shutil.rmtree(store, ignore_errors=True)
+            started = time.perf_counter()
+            bench_collection = chromadb.PersistentClient(path=store).get_or_create_collection("startup_benchmark")
+            for start in range(0, size, batch_size):
+                count = min(batch_size, size - start)
+                bench_collection.add(ids=[str(number) for number in range(start, start + count)],
+                                     embeddings=rng.random((count, dimensions), dtype=np.float32),
+                                     documents=[f"document {number}" for number in range(start, start + count)])
+            bench_collection.query(query_embeddings=query, n_results=5)
+            cold_seconds = time.perf_counter() - started
+            SharedSystemClient.clear_system_cache()  # Drop the in-process client so the reopen really hits disk
+            started = time.perf_counter()
+            bench_collection = chromadb.PersistentClient(path=store).get_collection("startup_benchmark")
+            bench_collection.query(query_embeddings=query, n_results=5)
+            warm_seconds = time.perf_counter() - started
+            SharedSystemClient.clear_system_cache()
+            report.append({"documents": size, "cold_seconds": cold_seconds, "warm_seconds": warm_seconds})
+            logging.info(f"{size} documents: cold start {cold_seconds:.2f}s, warm start {warm_seconds:.2f}s to first query.")
+    finally:
+        if path is None:
+            shutil.rmtree(root, ignore_errors=True)
+    return report
+
+# ---------------------------
+# Chunking
+# ---------------------------
+# Splits each (id, document, metadata) record into chunks between fetching and ingestion. Chunk ids are
+# "<source id>#<character offset>", so they are stable across runs, and chunk metadata keeps the source's
+# metadata plus source_id / chunk_offset / chunk_index pointing back to the original document.
+# Splitting runs on a process pool; on platforms that spawn processes (Windows, macOS) run the script
+# as `python script.py` so the main section below is guarded by __name__ == "__main__".
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+def chunk_fixed(text, size=CHUNK_SIZE, overlap=CHUNK_OVERLAP):
+    """
+    Split text into fixed-size windows that overlap by `overlap` characters.
+    :return: List of (offset, chunk text)
+    """
+    step = max(size - overlap, 1)
+    return [(offset, text[offset:offset + size]) for offset in range(0, max(len(text) - overlap, 1), step)]
+
+def chunk_sentences(text, size=CHUNK_SIZE, overlap=CHUNK_OVERLAP):
+    """
+    Pack whole sentences into chunks of about `size` characters, repeating trailing sentences of up to
+    `overlap` characters at the start of the next chunk. Sentences longer than `size` are split with chunk_fixed.
+    :return: List of (offset, chunk text)
+    """
+    sentences = []  # (start, end) spans in the original text
+    start = 0
+    for match in SENTENCE_END.finditer(text):
+        sentences.append((start, match.start()))
+        start = match.end()
+    if start < len(text):
+        sentences.append((start, len(text)))
+    chunks, current = [], []
+    for span in sentences:
+        if span[1] - span[0] > size:
+            if current:
+                chunks.append((current[0][0], text[current[0][0]:current[-1][1]]))
+                current = []
+            chunks.extend((span[0] + offset, part) for offset, part in chunk_fixed(text[span[0]:span[1]], size, overlap))
+            continue
+        if current and span[1] - current[0][0] > size:
+            chunks.append((current[0][0], text[current[0][0]:current[-1][1]]))
+            carried = []
+            for previous in reversed(current):
+                if span[1] - previous[0] > size or current[-1][1] - previous[0] > overlap:
+                    break
+                carried.insert(0, previous)
+            current = carried
+        current.append(span)
+    if current:
+        chunks.append((current[0][0], text[current[0][0]:current[-1][1]]))
+    return chunks or [(0, text)]
 
-# Initialize lists to store documents, metadatas, and ids
-documents = []
-metadatas = []
-ids = []
+def chunk_record(record, strategy=CHUNK_STRATEGY, size=CHUNK_SIZE, overlap=CHUNK_OVERLAP):
+    """
+    Split one record into chunk records.
+    :param record: (id, document, metadata) tuple
+    :return: List of (chunk id, chunk text, chunk metadata) tuples
+    """
+    record, error = coerce_record(record)
+    if error is not None:
+        return [record]  # Left unsplit so ingest_records() reports it
+    source_id, text, metadata = record
+    splitter = chunk_sentences if strategy == "sentence" else chunk_fixed
+    return [
+        (f"{source_id}#{offset}", chunk,
+         dict(metadata or {}, source_id=source_id, chunk_offset=offset, chunk_index=index))
+        for index, (offset, chunk) in enumerate(splitter(text, size, overlap))
+        if chunk.strip()
+    ]
+
+def _timed_chunk_record(record, strategy, size, overlap):
+    """
+    Chunk one record in a worker process and report how long it took, since metrics are kept in the parent.
+    """
+    started = time.perf_counter()
+    chunks = chunk_record(record, strategy, size, overlap)
+    return chunks, time.perf_counter() - started
+
+def source_id_of(chunk_id):
+    """
+    Recover the source id from a chunk id.
+    """
+    return chunk_id.rpartition("#")[0] or chunk_id
+
+def replace_chunks(collection, records):
+    """
+    Delete the stored chunks of each record's source before passing the record on, since a new version of a
+    document may have fewer chunks than the old one.
+    :param collection: ChromaDB collection
+    :param records: Iterable of unchunked (id, document, metadata) records
+    :return: Generator of the same records
+    """
+    for record in records:
+        collection.delete(where={"source_id": record[0]})
+        yield record
+
+def chunk_records(records, strategy=CHUNK_STRATEGY, size=CHUNK_SIZE, overlap=CHUNK_OVERLAP, workers=CHUNK_WORKERS,
+                  window=64, executor=None):
+    """
+    Chunk a stream of records, splitting up to `window` records at a time across a process pool.
+    Input order is preserved and at most one window of documents is held in memory.
+    :param records: Iterable of (id, document, metadata) tuples
+    :param workers: Number of processes (1 chunks in the calling process)
+    :param window: Records handed to the pool per round
+    :param executor: Existing ProcessPoolExecutor to reuse across calls; left running when the records are done
+    :return: Generator of chunk records
+    """
+    if executor is None and workers <= 1:
+        for record in records:
+            with pipeline_metrics.timed("chunk") as call:
+                chunks = chunk_record(record, strategy, size, overlap)
+                call["items"] = len(chunks)
+            yield from chunks
+        return
+    records = iter(records)
+    with nullcontext(executor) if executor is not None else ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            batch = list(itertools.islice(records, window))
+            if not batch:
+                break
+            count = len(batch)
+            for chunks, seconds in executor.map(_timed_chunk_record, batch, [strategy] * count, [size] * count,
+                                                [overlap] * count, chunksize=max(count // workers, 1)):
+                pipeline_metrics.observe("chunk", seconds, len(chunks))
+                yield from chunks
+
+# ---------------------------
+# Concurrent Source Fetching
+# ---------------------------
+# Sources are SourceConnector subclasses: list_items() enumerates what to fetch (cheap) and fetch(item) downloads
+# one item and returns an (id, document, metadata) record, or None to skip it. fetch_concurrently() runs the fetches from all sources
+# on a bounded thread pool, interleaving sources and honouring each source's rate limit, and yields records as
+# they complete so they flow straight into ingest_records().
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls at least 1 / rate seconds apart.
+    :param rate: Maximum calls per second (None for unlimited)
+    """
+
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+class SourceConnector:
+    """
+    Base class for document sources.
+    :param rate_limit: Maximum fetches per second for this source (None for unlimited)
+    :param timeout: Seconds before a single fetch is abandoned (applied by connectors that do network IO)
+    """
+    name = "source"
+
+    def __init__(self, rate_limit=None, timeout=FETCH_TIMEOUT):
+        self.timeout = timeout
+        self._limiter = RateLimiter(rate_limit)
+
+    def list_items(self):
+        """
+        Enumerate the items this source can fetch.
+        """
+        raise NotImplementedError
+
+    def fetch(self, item):
+        """
+        Download one item.
+        :return: (id, document, metadata) record, or None when the item turns out not to need ingesting
+        """
+        raise NotImplementedError
+
+    def fetch_limited(self, item):
+        self._limiter.wait()
+        with pipeline_metrics.timed("fetch", 1):
+            return self.fetch(item)
+
+    def fingerprint(self):
+        """
+        Identify the source's current contents for warm starts; by default the type and the listed items.
+        Override when listing is expensive or does not reflect content changes, and return None when the
+        source cannot tell whether its contents changed.
+        """
+        return f"{type(self).__name__}:{sorted(map(str, self.list_items()))}"
+
+    def records(self):
+        """
+        Fetch every item sequentially.
+        """
+        for item in self.list_items():
+            record = self.fetch_limited(item)
+            if record is not None:
+                yield record
+
+def _as_text(content):
+    """
+    Decode downloaded bytes so the document can be embedded.
+    """
+    return content.decode("utf-8", errors="replace") if isinstance(content, bytes) else content
+
+def _interleave(iterables):
+    """
+    Round-robin over several iterables so one slow or rate-limited source does not hold up the others.
+    """
+    iterators = [iter(iterable) for iterable in iterables]
+    while iterators:
+        for iterator in list(iterators):
+            try:
+                yield next(iterator)
+            except StopIteration:
+                iterators.remove(iterator)
+
+def fetch_concurrently(connectors, max_workers=FETCH_WORKERS, max_in_flight=FETCH_MAX_IN_FLIGHT, failed=None):
+    """
+    Fetch items from all connectors on a bounded thread pool, yielding records as they complete.
+    Failed fetches are logged and skipped. A fetch still running after its connector's timeout is abandoned and
+    counted as failed, so a hung download cannot stall the ingest (its thread is left to finish on its own).
+    :param connectors: List of SourceConnector instances
+    :param max_workers: Number of fetch threads
+    :param max_in_flight: Maximum fetches submitted but not yet consumed
+    :param failed: Optional list that receives (source name, item) for every failed or timed-out fetch
+    :return: Generator of (id, document, metadata) records
+    """
+    work = _interleave([zip(itertools.repeat(connector), connector.list_items()) for connector in connectors])
+    failures = 0
+    abandoned = 0
+
+    def fetch_timed(connector, item, started):
+        started.append(time.monotonic())  # The deadline runs from when a worker picks the item up, not from submission
+        return connector.fetch_limited(item)
+
+    def fail(source, source_item, error):
+        nonlocal failures
+        failures += 1
+        if failed is not None:
+            failed.append((source.name, source_item))
+        logging.error(f"Fetching {source_item!r} from {source.name} failed: {error}")
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        pending = {}
+        for connector, item in itertools.chain(work, [(None, None)]):  # The sentinel drains what is left
+            if connector is not None:
+                started = []
+                pending[executor.submit(fetch_timed, connector, item, started)] = (connector, item, started)
+                if len(pending) < max_in_flight:
+                    continue
+            while pending and (connector is None or len(pending) >= max_in_flight):
+                done, _ = wait(pending, timeout=1.0, return_when=FIRST_COMPLETED)
+                for future in done:
+                    source, source_item, _ = pending.pop(future)
+                    try:
+                        record = future.result()
+                    except Exception as e:
+                        fail(source, source_item, e)
+                        continue
+                    if record is not None:
+                        yield record
+                now = time.monotonic()
+                for future, (source, source_item, started) in list(pending.items()):
+                    if source.timeout and started and now - started[0] > source.timeout and not future.done():
+                        del pending[future]
+                        abandoned += 1
+                        fail(source, source_item, f"timed out after {source.timeout}s")
+    finally:
+        # Waiting on an abandoned fetch would bring the stall back
+        executor.shutdown(wait=not abandoned, cancel_futures=True)
+    if failures:
+        logging.warning(f"{failures} items could not be fetched.")
+
+# ---------------------------
+# Batched Queries
+# ---------------------------
+# Answers many queries per collection.query call. Each query may carry its own `where` filter on the metadata
+# the sources attach (filename, url, source_id, ...); queries sharing a filter are sent together, and the
+# results are returned one entry per input query, in input order.
+
+def query_collection(collection, query_texts=None, query_embeddings=None, where=None, n_results=QUERY_N_RESULTS,
+                     batch_size=QUERY_BATCH_SIZE, include=("documents", "metadatas", "distances")):
+    """
+    Run a list of queries in batches.
+    :param collection: ChromaDB collection
+    :param query_texts: List of query strings (embedded by the collection's embedding function)
+    :param query_embeddings: List or array of precomputed query embeddings (instead of query_texts)
+    :param where: None, one metadata filter for every query (e.g. {"filename": "a.txt"}), or a list with one
+                  filter (or None) per query
+    :param n_results: Results per query
+    :param batch_size: Queries per collection.query call
+    :param include: Fields to return
+    :return: List with one dict (ids, plus the included fields) per query, aligned with the input
+    """
+    if (query_texts is None) == (query_embeddings is None):
+        raise ValueError("Pass exactly one of query_texts or query_embeddings")
+    queries = list(query_texts) if query_texts is not None else list(query_embeddings)
+    wheres = where if isinstance(where, list) else [where] * len(queries)
+    if len(wheres) != len(queries):
+        raise ValueError(f"Got {len(wheres)} filters for {len(queries)} queries")
+    groups = {}
+    for row, query_filter in enumerate(wheres):
+        key = json.dumps(query_filter, sort_keys=True)
+        groups.setdefault(key, (query_filter, []))[1].append(row)
+    results = [None] * len(queries)
+    for query_filter, rows in groups.values():
+        for start in range(0, len(rows), batch_size):
+            batch_rows = rows[start:start + batch_size]
+            batch = [queries[row] for row in batch_rows]
+            with pipeline_metrics.timed("search", len(batch)):
+                response = collection.query(
+                    query_texts=batch if query_texts is not None else None,
+                    query_embeddings=batch if query_embeddings is not None else None,
+                    where=query_filter,
+                    n_results=n_results,
+                    include=list(include),
+                )
+            for position, row in enumerate(batch_rows):
+                results[row] = {field: response[field][position] for field in ("ids",) + tuple(include)}
+    return results
+
+def benchmark_query_batches(collection, query_texts, batch_sizes=(1, 8, 32, 128), n_results=QUERY_N_RESULTS, where=None,
+                            embedding_function=None):
+    """
+    Compare query throughput and per-call latency of query_collection across batch sizes. The query texts are
+    embedded once up front, so the numbers reflect search rather than embedding.
+    :param collection: ChromaDB collection
+    :param query_texts: Query strings to run at every batch size
+    :param batch_sizes: Batch sizes to measure
+    :param n_results: Results per query
+    :param where: Optional metadata filter applied to every query
+    :param embedding_function: Embedding function for the queries; must match the one the collection was created
+                               with, and defaults to get_embedding_function() (the one get_collection() uses)
+    :return: List of dicts with batch_size, queries_per_sec, p50_call_ms and p95_call_ms
+    """
+    embedding_function = embedding_function or get_embedding_function()
+    query_embeddings = embedding_function.embed_query(list(query_texts))
+    report = []
+    for batch_size in batch_sizes:
+        latencies = []
+        started = time.perf_counter()
+        for start in range(0, len(query_embeddings), batch_size):
+            # One slice per call, so each query_collection call is a single collection.query round-trip
+            call_started = time.perf_counter()
+            query_collection(collection, query_embeddings=query_embeddings[start:start + batch_size], where=where,
+                             n_results=n_results, batch_size=batch_size)
+            latencies.append(time.perf_counter() - call_started)
+        seconds = time.perf_counter() - started
+        report.append({
+            "batch_size": batch_size,
+            "queries_per_sec": len(query_embeddings) / seconds,
+            "p50_call_ms": float(np.percentile(latencies, 50) * 1000),
+            "p95_call_ms": float(np.percentile(latencies, 95) * 1000),
+        })
+        logging.info(f"Batch size {batch_size}: {report[-1]['queries_per_sec']:.0f} queries/s, "
+                     f"p50 {report[-1]['p50_call_ms']:.1f} ms, p95 {report[-1]['p95_call_ms']:.1f} ms per call")
+    return report
 
 # Credential Management Options
 
@@ -115,117 +1187,529 @@ ids = []
 # Uncomment and configure the sections as needed based on your document source and key management strategy
 
 # Document source and credential management options
+# Each source is a SourceConnector; enable it by adding an instance to `sources` below.
 # ---------------------------
 # Local Files
 # ---------------------------
-# directory_path = "path_to_your_documents"  # Replace with the path to your documents
-# for filename in os.listdir(directory_path):
-#     if filename.endswith(".txt"):  # or .pdf, .docx, etc. based on your files
-#         file_path = os.path.join(directory_path, filename)
-#         # Open and read the file content
-#         with open(file_path, 'r') as file:
-#             content = file.read()
-#         documents.append(content)
-#         metadatas.append({"filename": filename})  # Add any other metadata you might have
-#         ids.append(filename)  # Or any other unique identifier
+# Files are found recursively with os.scandir. With a manifest, files whose size and mtime match the manifest
+# are skipped without being opened, files that were only touched are recognised by their content hash, and
+# files that disappeared are reported by removed_ids() so sync_local_files() can delete them.
+
+def scan_files(directory_path, extensions=(".txt",)):
+    """
+    Recursively list matching files.
+    :return: Generator of (relative path, size, mtime_ns)
+    """
+    stack = [directory_path]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(extensions) and entry.is_file():
+                    stat = entry.stat()
+                    relative_path = os.path.relpath(entry.path, directory_path).replace(os.sep, "/")
+                    yield relative_path, stat.st_size, stat.st_mtime_ns
+
+def load_file_manifest(manifest_path=LOCAL_FILES_MANIFEST):
+    """
+    Read the local-files manifest.
+    :return: Dict of relative path -> [size, mtime_ns, sha256]
+    """
+    if not manifest_path or not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path) as file:
+        return json.load(file)
+
+class LocalDirectoryConnector(SourceConnector):
+    """
+    Read text files from a local directory tree. Also useful as a stand-in for the cloud sources when testing,
+    e.g. LocalDirectoryConnector(path, metadata_key="dropbox_id").
+    Pass manifest_path to only fetch files that are new or changed since the last save_manifest().
+    """
+    name = "local files"
+
+    def __init__(self, directory_path="path_to_your_documents", extensions=(".txt",), metadata_key="filename",  # Replace with the path to your documents
+                 manifest_path=None, **kwargs):
+        super().__init__(**kwargs)
+        self.directory_path = directory_path
+        self.extensions = extensions  # or .pdf, .docx, etc. based on your files
+        self.metadata_key = metadata_key
+        self.manifest_path = manifest_path
+        self.manifest = load_file_manifest(manifest_path)
+        self.seen = set()
+        self.updated = {}
+        self.scan_stats = {"files": 0, "unchanged": 0, "touched": 0, "changed": 0}
+        self._lock = threading.Lock()  # fetch() runs on several threads
+
+    def list_items(self):
+        for relative_path, size, mtime_ns in scan_files(self.directory_path, self.extensions):
+            self.seen.add(relative_path)
+            self.scan_stats["files"] += 1
+            entry = self.manifest.get(relative_path)
+            if entry is not None and entry[0] == size and entry[1] == mtime_ns:
+                self.scan_stats["unchanged"] += 1
+                continue
+            yield relative_path, size, mtime_ns
+
+    def fetch(self, item):
+        relative_path, size, mtime_ns = item
+        # Open and read the file content
+        with open(os.path.join(self.directory_path, relative_path), 'rb') as file:
+            content = file.read()
+        content_hash = hashlib.sha256(content).hexdigest()
+        entry = self.manifest.get(relative_path)
+        unchanged = entry is not None and entry[2] == content_hash  # Only the mtime changed; nothing to re-embed
+        with self._lock:
+            self.updated[relative_path] = [size, mtime_ns, content_hash]
+            self.scan_stats["touched" if unchanged else "changed"] += 1
+        if unchanged:
+            return None
+        return relative_path, _as_text(content), {self.metadata_key: relative_path}  # Or any other unique identifier / metadata you might have
+
+    def fingerprint(self):
+        return f"{type(self).__name__}:{sorted(scan_files(self.directory_path, self.extensions))}"
+
+    def removed_ids(self):
+        """
+        Paths in the manifest that were not found by the last scan.
+        """
+        return [path for path in self.manifest if path not in self.seen]
+
+    def save_manifest(self, failed_ids=()):
+        """
+        Record the scanned state, leaving out files whose ingestion failed so they are retried next time.
+        """
+        failed = set(failed_ids)
+        manifest = {path: entry for path, entry in self.manifest.items() if path in self.seen and path not in failed}
+        manifest.update({path: entry for path, entry in self.updated.items() if path not in failed})
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(manifest, file)
+        os.replace(tmp_path, self.manifest_path)
+        self.manifest = manifest
+
+def sync_local_files(collection, directory_path, manifest_path=LOCAL_FILES_MANIFEST, extensions=(".txt",),
+                     max_workers=FETCH_WORKERS, chunking=CHUNKING_ENABLED):
+    """
+    Upsert new or changed files and delete removed ones, using the manifest to skip unchanged files.
+    :param collection: ChromaDB collection
+    :param directory_path: Root of the directory tree to ingest
+    :param manifest_path: Path of the local-files manifest
+    :param extensions: File extensions to ingest
+    :param max_workers: Number of threads reading files
+    :param chunking: Store files as chunks (see Chunking); a changed file's old chunks are replaced
+    :return: Dict with scan counts, upserted, deleted, failed and seconds
+    """
+    started = time.perf_counter()
+    connector = LocalDirectoryConnector(directory_path, extensions, manifest_path=manifest_path)
+    records = fetch_concurrently([connector], max_workers=max_workers)
+    if chunking:
+        records = chunk_records(replace_chunks(collection, records))
+    report = ingest_records(collection, records, upsert=True)
+    failed_ids = list({source_id_of(record_id) if chunking else record_id
+                       for result in report for record_id in result.get("failed_ids", [])})
+    removed = connector.removed_ids()
+    for start in range(0, len(removed), ADD_BATCH_SIZE):
+        if chunking:
+            collection.delete(where={"source_id": {"$in": removed[start:start + ADD_BATCH_SIZE]}})
+        else:
+            collection.delete(ids=removed[start:start + ADD_BATCH_SIZE])
+    connector.save_manifest(failed_ids)
+    stats = dict(connector.scan_stats, upserted=connector.scan_stats["changed"] - len(failed_ids),
+                 deleted=len(removed), failed=len(failed_ids), seconds=time.perf_counter() - started)
+    logging.info(f"Synced {directory_path}: {stats['files']} files, {stats['upserted']} upserted, "
+                 f"{stats['deleted']} deleted, {stats['unchanged'] + stats['touched']} unchanged "
+                 f"in {stats['seconds']:.2f}s.")
+    return stats
+
+def benchmark_local_rescan(directory_path=None, num_files=1_000_000, files_per_dir=1000, manifest_path=None):
+    """
+    Time a no-change re-scan: build a manifest for a directory tree, then scan it again against the manifest.
+    When no directory is given a synthetic tree of num_files small files is generated in a temporary directory.
+    Generated files and the default manifest live in temporary directories that are removed afterwards, so the
+    real LOCAL_FILES_MANIFEST used by sync_local_files is never touched.
+    :param manifest_path: Manifest file to build and re-scan against (a temporary file when omitted)
+    :return: Dict with files, manifest_seconds (first full pass) and rescan_seconds
+    """
+    import shutil
+    import tempfile
+    scratch = tempfile.mkdtemp(prefix="rescan_benchmark_")
+    try:
+        if manifest_path is None:
+            manifest_path = os.path.join(scratch, "manifest.json")
+        if directory_path is None:
+            directory_path = os.path.join(scratch, "tree")
+            for number in range(num_files):
+                subdirectory = os.path.join(directory_path, f"{number // files_per_dir:05d}")
+                if number % files_per_dir == 0:
+                    os.makedirs(subdirectory, exist_ok=True)
+                with open(os.path.join(subdirectory, f"{number}.txt"), "w") as file:
+                    file.write(f"document {number}")
+        started = time.perf_counter()
+        connector = LocalDirectoryConnector(directory_path, manifest_path=manifest_path)
+        for item in connector.list_items():
+            connector.fetch(item)
+        connector.save_manifest()
+        manifest_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        connector = LocalDirectoryConnector(directory_path, manifest_path=manifest_path)
+        changed = sum(1 for _ in connector.list_items())
+        rescan_seconds = time.perf_counter() - started
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    logging.info(f"No-change re-scan of {connector.scan_stats['files']} files took {rescan_seconds:.2f}s "
+                 f"({changed} changed; first pass {manifest_seconds:.2f}s).")
+    return {"files": connector.scan_stats["files"], "manifest_seconds": manifest_seconds,
+            "rescan_seconds": rescan_seconds}
 
 # ---------------------------
 # Google Drive (requires setup)
 # ---------------------------
-# from googleapiclient.discovery import build
-# from google.oauth2.credentials import Credentials
-# creds = Credentials.from_authorized_user_file(os.getenv('GOOGLE_TOKEN_JSON'))  # Replace with your credentials file or use .env
-# service = build('drive', 'v3', credentials=creds)
-# # Call the Drive v3 API
-# results = service.files().list(pageSize=10, fields="nextPageToken, files(id, name)").execute()
-# items = results.get('files', [])
-# if not items:
-#     print('No files found.')
-# else:
-#     for item in items:
-#         # Download and read file content
-#         request = service.files().get_media(fileId=item['id'])
-#         content = request.execute()
-#         documents.append(content)
-#         metadatas.append({"google_drive_id": item['id']})
-#         ids.append(item['id'])
+class GoogleDriveConnector(SourceConnector):
+    name = "google drive"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._local = threading.local()  # The Drive client is not thread-safe, so each fetch thread builds its own
+
+    def _service(self):
+        if not hasattr(self._local, "service"):
+            from googleapiclient.discovery import build
+            from google.oauth2.credentials import Credentials
+            import httplib2
+            from google_auth_httplib2 import AuthorizedHttp
+            creds = Credentials.from_authorized_user_file(os.getenv('GOOGLE_TOKEN_JSON'))  # Replace with your credentials file or use .env
+            # An explicit http object carries the socket timeout; build() uses no timeout by default
+            self._local.service = build('drive', 'v3', http=AuthorizedHttp(creds, http=httplib2.Http(timeout=self.timeout)))
+        return self._local.service
+
+    def list_items(self):
+        # Call the Drive v3 API, following nextPageToken until every file is listed; modifiedTime is requested so the
+        # default fingerprint changes when a file is edited
+        page_token = None
+        while True:
+            results = self._service().files().list(pageSize=100, pageToken=page_token,
+                                                   fields="nextPageToken, files(id, name, modifiedTime)").execute()
+            yield from results.get('files', [])
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+
+    def fetch(self, item):
+        # Download and read file content
+        content = self._service().files().get_media(fileId=item['id']).execute(num_retries=2)
+        return item['id'], _as_text(content), {"google_drive_id": item['id']}
 
 # ---------------------------
 # Fetch from Web
 # ---------------------------
-# import requests
-# urls = ["http://example.com/document1", "http://example.com/document2"]  # Replace with your document URLs
-# for url in urls:
-#     response = requests.get(url)
-#     documents.append(response.text)
-#     metadatas.append({"url": url})
-#     ids.append(url)  # Or any other unique identifier
+class WebConnector(SourceConnector):
+    """
+    Fetch documents over HTTP through one pooled, keep-alive session.
+    """
+    name = "web"
+
+    def __init__(self, urls=("http://example.com/document1", "http://example.com/document2"), pool_size=HTTP_POOL_SIZE, **kwargs):  # Replace with your document URLs
+        super().__init__(**kwargs)
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.urls = list(urls)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def list_items(self):
+        return self.urls
+
+    def fetch(self, url):
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return url, response.text, {"url": url}  # Or any other unique identifier
+
+    def fingerprint(self):
+        # HEAD each URL for its ETag or Last-Modified validator; without one a changed page cannot be detected
+        validators = []
+        for url in self.urls:
+            try:
+                response = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+                response.raise_for_status()
+            except Exception as e:
+                logging.warning(f"Could not check {url} for changes: {e}")
+                return None
+            validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+            if validator is None:
+                return None
+            validators.append((url, validator))
+        return f"{type(self).__name__}:{sorted(validators)}"
 
 # ---------------------------
 # OneDrive (requires setup)
 # ---------------------------
-# from onedrivesdk import HttpProvider, AuthProvider, OneDriveClient
-# http_provider = HttpProvider()  # Initialize your HttpProvider
-# client_id = os.getenv('ONEDRIVE_CLIENT_ID')  # Replace with your client ID or use .env
-# scopes = ['wl.signin', 'wl.offline_access', 'onedrive.readwrite']  # Define your scopes
-# auth_provider = AuthProvider(http_provider, client_id, scopes)
-# client = OneDriveClient(os.getenv('ONEDRIVE_API_BASE_URL'), auth_provider, http_provider)  # Replace with your API base URL or use .env
-# items = client.item(drive='me', id='root').children.get()
-# for item in items:
-#     # Download and read file content
-#     content = client.item(drive='me', id=item.id).content.request().get()
-#     documents.append(content)
-#     metadatas.append({"onedrive_id": item.id})
-#     ids.append(item.id)
+class OneDriveConnector(SourceConnector):
+    name = "onedrive"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        from onedrivesdk import HttpProvider, AuthProvider, OneDriveClient
+        http_provider = HttpProvider()  # Initialize your HttpProvider
+        client_id = os.getenv('ONEDRIVE_CLIENT_ID')  # Replace with your client ID or use .env
+        scopes = ['wl.signin', 'wl.offline_access', 'onedrive.readwrite']  # Define your scopes
+        auth_provider = AuthProvider(http_provider, client_id, scopes)
+        self.client = OneDriveClient(os.getenv('ONEDRIVE_API_BASE_URL'), auth_provider, http_provider)  # Replace with your API base URL or use .env
+
+    def list_items(self):
+        return [item.id for item in self.client.item(drive='me', id='root').children.get()]
+
+    def fingerprint(self):
+        # The eTag changes whenever an item's content or metadata changes
+        items = self.client.item(drive='me', id='root').children.get()
+        return f"{type(self).__name__}:{sorted((item.id, item.e_tag or str(item.last_modified_date_time)) for item in items)}"
+
+    def fetch(self, item_id):
+        # Download and read file content; the SDK's HttpProvider takes no timeout, so fetch_concurrently enforces it
+        content = self.client.item(drive='me', id=item_id).content.request().get()
+        return item_id, _as_text(content), {"onedrive_id": item_id}
 
 # ---------------------------
 # Dropbox (requires setup)
 # ---------------------------
-# import dropbox
-# dbx = dropbox.Dropbox(os.getenv('DROPBOX_ACCESS_TOKEN'))  # Replace with your access token or use .env
-# for entry in dbx.files_list_folder('').entries:
-#     # Download and read file content
-#     metadata, res = dbx.files_download('/' + entry.name)
-#     content = res.content
-#     documents.append(content)
-#     metadatas.append({"dropbox_id": metadata.id})
-#     ids.append(metadata.id)
+class DropboxConnector(SourceConnector):
+    name = "dropbox"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        import dropbox
+        self.dbx = dropbox.Dropbox(os.getenv('DROPBOX_ACCESS_TOKEN'), timeout=self.timeout)  # Replace with your access token or use .env
+
+    def list_items(self):
+        return [entry.name for entry in self.dbx.files_list_folder('').entries]
+
+    def fingerprint(self):
+        # Every upload of a file gets a new rev
+        entries = self.dbx.files_list_folder('').entries
+        return f"{type(self).__name__}:{sorted((entry.name, getattr(entry, 'rev', None) or '') for entry in entries)}"
+
+    def fetch(self, name):
+        # Download and read file content
+        metadata, res = self.dbx.files_download('/' + name)
+        return metadata.id, _as_text(res.content), {"dropbox_id": metadata.id}
 
 # ---------------------------
 # Apple's iCloud (requires setup)
 # ---------------------------
-# from pyicloud import PyiCloudService
-# icloud = PyiCloudService(os.getenv('APPLE_ID'), os.getenv('ICLOUD_PASSWORD'))  # Replace with your credentials or use .env
-# for file in icloud.drive['Documents']:
-#     # Download and read file content
-#     content = file.open(stream=True).content
-#     documents.append(content)
-#     metadatas.append({"icloud_id": file.id})
-#     ids.append(file.id)
+class ICloudConnector(SourceConnector):
+    name = "icloud"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        from pyicloud import PyiCloudService
+        self.icloud = PyiCloudService(os.getenv('APPLE_ID'), os.getenv('ICLOUD_PASSWORD'))  # Replace with your credentials or use .env
+
+    def list_items(self):
+        return list(self.icloud.drive['Documents'])
+
+    def fingerprint(self):
+        # Modification date and size of each document
+        files = self.list_items()
+        return f"{type(self).__name__}:{sorted((file.name, str(file.date_modified), str(file.size)) for file in files)}"
+
+    def fetch(self, file):
+        # Download and read file content
+        content = file.open(stream=True, timeout=self.timeout).content  # Passed through to the requests session
+        return file.id, _as_text(content), {"icloud_id": file.id}
 
 # ---------------------------
 # Database (generic SQL)
 # ---------------------------
-# import psycopg2
-# connection = psycopg2.connect(user=os.getenv('DB_USER'), password=os.getenv('DB_PASSWORD'), host=os.getenv('DB_HOST'), port=os.getenv('DB_PORT'), database=os.getenv('DB_NAME'))  # Replace with your credentials or use .env
-# cursor = connection.cursor()
-# cursor.execute("SELECT document_content, document_id, document_metadata FROM your_table")
-# records = cursor.fetchall()
-# for record in records:
-#     documents.append(record[0])
-#     metadatas.append({"source": "your_database", "additional_metadata": record[2]})
-#     ids.append(record[1])
-
-# Add documents to the collection
-collection.add(
-    documents=documents,
-    metadatas=metadatas,
-    ids=ids
-)
-
-# Query the collection (optional, for testing)
-results = collection.query(
-    query_texts=["This is a query document"],
-    n_results=2
-)
-print(results)
+class DatabaseConnector(SourceConnector):
+    """
+    Stream rows with a server-side cursor (a named cursor on PostgreSQL) in fetchmany() chunks, ordered by the
+    id column so a load can resume after the last ingested id (keyset pagination). Rows arrive with their content,
+    so fetch() does no further IO.
+    :param connect: Callable returning a DB-API connection; defaults to PostgreSQL using the DB_* environment variables
+    :param table: Table to read
+    :param id_column: Unique, orderable column used as document id and resume key
+    :param content_column: Column holding the document text
+    :param metadata_column: Column stored as additional_metadata
+    :param fetch_size: Rows per fetchmany() call
+    """
+    name = "database"
+
+    def __init__(self, connect=None, table="your_table", id_column="document_id", content_column="document_content",
+                 metadata_column="document_metadata", fetch_size=DB_FETCH_SIZE, **kwargs):
+        super().__init__(**kwargs)
+        self.connect = connect or self._connect_postgres
+        self.table = table
+        self.id_column = id_column
+        self.content_column = content_column
+        self.metadata_column = metadata_column
+        self.fetch_size = fetch_size
+
+    @staticmethod
+    def _connect_postgres():
+        import psycopg2
+        return psycopg2.connect(user=os.getenv('DB_USER'), password=os.getenv('DB_PASSWORD'), host=os.getenv('DB_HOST'), port=os.getenv('DB_PORT'), database=os.getenv('DB_NAME'))  # Replace with your credentials or use .env
+
+    def iter_row_chunks(self, after_id=None):
+        """
+        Stream the table in id order, one fetchmany() chunk at a time.
+        :param after_id: Only return rows with an id greater than this (resume point)
+        :return: Generator of lists of (id, content, metadata) rows
+        """
+        connection = self.connect()
+        try:
+            placeholder = "?" if isinstance(connection, sqlite3.Connection) else "%s"
+            query = f"SELECT {self.id_column}, {self.content_column}, {self.metadata_column} FROM {self.table}"
+            params = ()
+            if after_id is not None:
+                query += f" WHERE {self.id_column} > {placeholder}"
+                params = (after_id,)
+            query += f" ORDER BY {self.id_column}"
+            try:
+                # A named cursor keeps the result set on the server; rows are only transferred as they are fetched
+                cursor = connection.cursor(name="chroma_ingest")
+            except TypeError:
+                cursor = connection.cursor()  # Drivers without named cursors (e.g. SQLite) already stream rows
+            cursor.execute(query, params)
+            while True:
+                with pipeline_metrics.timed("fetch") as call:
+                    rows = cursor.fetchmany(self.fetch_size)
+                    call["items"] = len(rows)
+                if not rows:
+                    break
+                yield rows
+            cursor.close()
+        finally:
+            connection.close()
+
+    def to_record(self, row):
+        metadata = {"source": "your_database"}
+        if row[2] is not None:
+            metadata["additional_metadata"] = row[2] if isinstance(row[2], (str, int, float, bool)) else json.dumps(row[2], default=str)
+        return str(row[0]), row[1], metadata
+
+    def list_items(self):
+        for rows in self.iter_row_chunks():
+            yield from rows
+
+    def fetch(self, row):
+        return self.to_record(row)
+
+    def fetch_limited(self, row):
+        # Rows are already timed as fetchmany() round-trips in iter_row_chunks
+        self._limiter.wait()
+        return self.fetch(row)
+
+    def fingerprint(self):
+        # Listing would read the whole table; bump INGEST_VERSION when the table changes
+        return type(self).__name__
+
+def ingest_database(collection, connector, checkpoint_path=DB_CHECKPOINT_PATH, chunking=CHUNKING_ENABLED):
+    """
+    Stream a database table into the collection chunk by chunk, checkpointing the last ingested id after each chunk.
+    A later call continues after the checkpoint, so an interrupted load resumes and an append-only table only
+    loads new rows. Delete the checkpoint file to reload the table from the start.
+    :param collection: ChromaDB collection
+    :param connector: DatabaseConnector instance
+    :param checkpoint_path: JSON file holding the last ingested id per table
+    :param chunking: Split documents into chunks before adding them (see Chunking)
+    :return: Dict with rows, chunks (fetchmany round-trips), last_id, complete and seconds
+    """
+    started = time.perf_counter()
+    checkpoints = {}
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as file:
+            checkpoints = json.load(file)
+    last_id = checkpoints.get(connector.table)
+    if last_id is not None:
+        logging.info(f"Resuming '{connector.table}' after id {last_id!r}.")
+    stats = {"rows": 0, "chunks": 0, "last_id": last_id, "complete": True}
+    # One chunking pool for the whole load rather than a new set of worker processes per fetchmany chunk
+    executor = ProcessPoolExecutor(max_workers=CHUNK_WORKERS) if chunking and CHUNK_WORKERS > 1 else None
+    try:
+        for rows in connector.iter_row_chunks(after_id=last_id):
+            records = (connector.to_record(row) for row in rows)
+            if chunking:
+                records = chunk_records(records, executor=executor)
+            report = ingest_records(collection, records, upsert=True)
+            # Invalid rows are reported and skipped; only failed batches are worth resuming from
+            if any(result["error"] is not None and result["batch"] is not None for result in report):
+                logging.error(f"Stopping '{connector.table}' load; it will resume after id {stats['last_id']!r}.")
+                stats["complete"] = False
+                break
+            stats["rows"] += len(rows)
+            stats["chunks"] += 1
+            stats["last_id"] = rows[-1][0]
+            checkpoints[connector.table] = stats["last_id"]
+            with open(checkpoint_path + ".tmp", "w") as file:
+                json.dump(checkpoints, file)
+            os.replace(checkpoint_path + ".tmp", checkpoint_path)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    stats["seconds"] = time.perf_counter() - started
+    logging.info(f"Loaded {stats['rows']} rows from '{connector.table}' in {stats['chunks']} chunks "
+                 f"({stats['seconds']:.2f}s, complete={stats['complete']}).")
+    return stats
+
+if __name__ == "__main__":
+    start_metrics_exporters()
+    collection = get_collection()
+
+    # Sources to ingest; uncomment the ones you have configured. rate_limit caps fetches per second for a source.
+    sources = [
+        # LocalDirectoryConnector("path_to_your_documents"),
+        # GoogleDriveConnector(rate_limit=10),
+        # WebConnector(["http://example.com/document1", "http://example.com/document2"], rate_limit=5),
+        # OneDriveConnector(rate_limit=10),
+        # DropboxConnector(rate_limit=10),
+        # ICloudConnector(rate_limit=2),
+        # DatabaseConnector(),
+    ]
+
+    # Skip the ingest when the persistent collection was already built from these sources (warm start)
+    fingerprint = ingest_fingerprint(sources)
+    if collection_is_current(collection, fingerprint):
+        logging.info(f"Collection '{collection_name}' is current ({collection.count()} records); skipping ingest.")
+    else:
+        # Fetch from all sources concurrently, split documents into chunks and stream them into the collection batch by
+        # batch, then drop chunks and documents the sources no longer contain
+        ingest_report = rebuild_collection(collection, sources, fingerprint)
+
+    # Incrementally re-ingest a local directory tree: only new or changed files are embedded, deleted files are removed
+    # local_sync_stats = sync_local_files(collection, "path_to_your_documents")
+
+    # Stream a SQL table through a server-side cursor with resumable, checkpointed progress
+    # (any DB-API connection works, e.g. DatabaseConnector(connect=lambda: sqlite3.connect("documents.db")))
+    # database_stats = ingest_database(collection, DatabaseConnector())
+
+    # Compare cold and warm time to first query for persistent collections of 10k to 1M documents
+    # startup_report = benchmark_startup()
+
+    # Time a no-change re-scan of a large tree (generates 1M small files in a temporary directory when no path is given)
+    # rescan_stats = benchmark_local_rescan()
+
+    # Query the collection (optional, for testing)
+    results = collection.query(
+        query_texts=["This is a query document"],
+        n_results=2
+    )
+    print(results)
+
+    # Answer many queries at once, optionally restricted by metadata (one filter for all, or one per query)
+    # batch_results = query_collection(collection, ["first query", "second query"],
+    #                                  where=[{"filename": "notes.txt"}, None], n_results=QUERY_N_RESULTS)
+
+    # Compare query throughput and latency across batch sizes
+    # query_report = benchmark_query_batches(collection, [f"query {number}" for number in range(1000)])
+
+    # Embedding cache effectiveness (duplicates across sources and repeated queries are served from disk)
+    if EMBEDDING_CACHE_ENABLED:
+        embedding_function = get_embedding_function()
+        logging.info(f"Embedding cache hit rate: {embedding_function.hit_rate():.1%} ({embedding_function.stats})")
+
+    # Time, items and errors per stage; set METRICS_EXPORT_PATH / METRICS_PORT for Prometheus, or send SIGUSR1
+    # (or call pipeline_metrics.start_profiling() / stop_profiling()) to profile a stretch of the run with cProfile
+    pipeline_metrics.log_summary()
@@ -22,8 +22,21 @@
 from qdrant_client import QdrantClient, models, AsyncQdrantClient
 import numpy as np
 import asyncio
+import atexit
+import cProfile
+import hashlib
+import io
 import logging
+import json
 import os
+import pstats
+import signal
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 # ---------------------------
 # Logging Setup
@@ -40,6 +53,57 @@ VECTOR_SIZE = 100
 HOST = "localhost"
 PORT = 6333
 GRPC_PORT = 6334
+RECREATE_COLLECTION = False  # True wipes the collection on every create_collection call; False keeps existing data
+SYNC_MANIFEST_PATH = "qdrant_sync_manifest.npz"  # Point ID -> content hash manifest used by sync_vectors
+EXPORT_SHARD_SIZE = 100000  # Points per exported .npy shard
+EXPORT_PAGE_SIZE = 1000  # Points fetched per scroll request during export
+UPLOAD_BATCH_SIZE = 256  # Points per columnar upsert; bounds peak memory during bulk uploads
+INGEST_WORKERS = 4  # Parallel upload workers used by ingest_vectors_parallel
+INGEST_MAX_IN_FLIGHT = 8  # Batches queued or uploading at once before the producer blocks
+INGEST_MAX_RETRIES = 3  # Attempts per batch before it is reported as failed
+ASYNC_MAX_CONCURRENCY = 32  # Requests in flight at once from the shared AsyncQdrantClient
+SEARCH_BATCH_SIZE = 64  # Queries per search_batch request; larger batches raise throughput but also per-call latency
+
+# Payload indexes created together with the collection. Every field used in a search filter should be listed here,
+# otherwise filtered searches check payloads point by point.
+# type: "keyword", "integer", "float", "bool", "geo", "datetime", "text" or "uuid"
+# integer fields also accept "range" (gte/lte conditions) and "lookup" (exact match conditions) flags
+PAYLOAD_INDEXES = [
+    {"field": "rand_number", "type": "integer", "range": True, "lookup": False},
+    {"field": "color", "type": "keyword"},
+]
+
+# Named collection profiles trading memory, recall and latency. The selected profile is applied when the collection
+# is created and when it is searched.
+# m / ef_construct: HNSW graph degree and build-time beam width (higher = better recall, more memory, slower build)
+# quantization: None, "scalar" (int8, ~4x smaller) or "product" (~16x smaller, lower recall)
+# on_disk: keep original vectors on disk and only the (quantized) index in RAM
+# hnsw_ef: search-time beam width (None uses the server default)
+COLLECTION_PROFILES = {
+    "default": {"m": 16, "ef_construct": 100, "quantization": None, "on_disk": False, "hnsw_ef": None},
+    "high_recall": {"m": 32, "ef_construct": 256, "quantization": None, "on_disk": False, "hnsw_ef": 256},
+    "low_latency": {"m": 16, "ef_construct": 100, "quantization": "scalar", "on_disk": False, "hnsw_ef": 64},
+    "low_memory": {"m": 16, "ef_construct": 100, "quantization": "scalar", "on_disk": True, "hnsw_ef": 128},
+    "compact": {"m": 8, "ef_construct": 64, "quantization": "product", "on_disk": True, "hnsw_ef": 128},
+}
+COLLECTION_PROFILE = "default"
+
+# Client-side cache for repeated searches. Entries are evicted least-recently-used beyond SEARCH_CACHE_SIZE
+# and expire after SEARCH_CACHE_TTL seconds. Writes through this script invalidate the affected collection.
+SEARCH_CACHE_ENABLED = False
+SEARCH_CACHE_SIZE = 10000
+SEARCH_CACHE_TTL = 300
+
+# Stage timings and counters (see Pipeline Metrics below). Durations are recorded for every upsert, search and
+# export scroll call; set an export path and/or port to read them in the Prometheus text format.
+METRICS_NAMESPACE = "qdrant_integration"
+METRICS_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_EXPORT_PATH = os.getenv("METRICS_EXPORT_PATH")  # Prometheus text file written at exit; None to skip
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # Serve http://localhost:<port>/metrics; 0 to disable
+METRICS_HOST = "127.0.0.1"  # Interface the metrics endpoint binds to; "0.0.0.0" exposes it to the network
+PROFILE_ENABLED = os.getenv("PROFILE_ENABLED") == "1"  # Run cProfile from startup
+PROFILE_SIGNAL = True  # SIGUSR1 toggles cProfile while the script runs (POSIX only)
+PROFILE_OUTPUT_PATH = "qdrant_profile.pstats"
 
 # ---------------------------
 # Error Handling
@@ -64,6 +128,20 @@ try:
     # Insert vectors into a collection
     # insert_vectors(client)
 
+    # Bulk upload a large float32 array or .npy file in columnar batches
+    # upload_vectors_bulk(client, "vectors.npy", payload_columns={"rand_number": np.arange(n) % 10})
+
+    # Upload from a pool of worker threads with bounded in-flight batches and retries
+    # stats = ingest_vectors_parallel(client, "vectors.npy", workers=INGEST_WORKERS)
+    # logging.info(f"Ingest throughput: {stats['points_per_sec']:.0f} points/sec")
+
+    # Upsert only new or changed points and delete removed ones, tracked by a local hash manifest
+    # sync_vectors(client, "vectors.npy", ids=point_ids, payload_columns={"rand_number": rand_numbers})
+
+    # Export a collection to memory-mapped .npy shards (resumable) and load it back
+    # export_collection(client, "exports/my_collection")
+    # import_exported_collection(client, "exports/my_collection", collection_name="my_collection_copy")
+
     # Search for similar vectors
     # hits = search_vectors(client)
     # logging.info(f"Search results: {hits}")
@@ -72,6 +150,28 @@ try:
     # filtered_hits = search_vectors_with_filter(client)
     # logging.info(f"Filtered search results: {filtered_hits}")
 
+    # Serve repeated query vectors and filters from an LRU/TTL cache
+    # enable_search_cache(max_entries=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL)
+    # hits = search_vectors_cached(client, query_vector, query_filter=rand_number_filter(gte=3))
+    # logging.info(f"Search cache stats: {search_cache.stats()}")
+
+    # Compare recall and latency of the collection profiles against brute-force ground truth
+    # report = profile_recall_report(client)
+
+    # Report filter fields that are used by queries but have no payload index
+    # find_unindexed_filter_fields(client, [rand_number_filter(gte=3)])
+
+    # Compare filtered-search latency before and after indexing at several selectivities
+    # report = benchmark_filtered_search(client)
+
+    # Search many query vectors per round-trip, results aligned to the input rows
+    # batch_hits = search_vectors_batch(client, np.random.rand(1000, VECTOR_SIZE), batch_size=SEARCH_BATCH_SIZE)
+
+    # Per-stage timings and counts: log a summary, export Prometheus text, or profile a section of work
+    # pipeline_metrics.log_summary()
+    # pipeline_metrics.write_prometheus("qdrant_metrics.prom")
+    # pipeline_metrics.start_profiling(); search_vectors_batch(client, queries); pipeline_metrics.stop_profiling()
+
     # ---------------------------
     # Resource Cleanup
     # ---------------------------
@@ -87,17 +187,370 @@ except Exception as e:
 # ---------------------------
 # Definitions of functions to interact with Qdrant
 
-def create_collection(client):
+# ---------------------------
+# Pipeline Metrics
+# ---------------------------
+# Per-stage timings and item counts. Each call wrapped in pipeline_metrics.timed(stage, items) is recorded in a
+# latency histogram for its stage, its items are added to a counter, and a call that raises also counts as an error.
+# Free-form counters (e.g. cache hits) are kept alongside. Everything is exported in the Prometheus text format,
+# either to a file (e.g. for node_exporter's textfile collector) or on an HTTP /metrics endpoint.
+# cProfile can be switched on and off while the process runs, from code or with SIGUSR1 on POSIX systems.
+# It profiles the thread that switches it on (every thread on Python 3.12+).
+
+class PipelineMetrics:
+    """
+    Thread-safe per-stage latency histograms and counters.
+    :param namespace: Prefix of the exported metric names
+    :param buckets: Upper bounds of the latency histogram buckets, in seconds
+    """
+
+    def __init__(self, namespace, buckets=METRICS_LATENCY_BUCKETS):
+        self.namespace = namespace
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._stages = {}  # stage -> {"buckets": per-bucket counts, "count", "sum", "items", "errors"}
+        self._counters = {}
+        self._profiler = None
+
+    def observe(self, stage, seconds, items=0, error=False):
+        """
+        Record one call of a stage.
+        """
+        with self._lock:
+            data = self._stages.setdefault(
+                stage, {"buckets": [0] * len(self.buckets), "count": 0, "sum": 0.0, "items": 0, "errors": 0})
+            for position, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    data["buckets"][position] += 1
+                    break
+            data["count"] += 1
+            data["sum"] += seconds
+            data["items"] += items
+            data["errors"] += int(error)
+
+    @contextmanager
+    def timed(self, stage, items=0):
+        """
+        Time the enclosed block as one call of a stage.
+        :param stage: Stage name (fetch, chunk, embed, upsert, search)
+        :param items: Items handled by the call; set call["items"] inside the block when only known afterwards
+        :return: Context manager yielding the call dict, which holds "seconds" after the block
+        """
+        call = {"items": items, "seconds": 0.0}
+        started = time.perf_counter()
+        try:
+            yield call
+        except Exception:
+            call["seconds"] = time.perf_counter() - started
+            self.observe(stage, call["seconds"], call["items"], error=True)
+            raise
+        call["seconds"] = time.perf_counter() - started
+        self.observe(stage, call["seconds"], call["items"])
+
+    def count(self, counter, amount=1):
+        """
+        Add to a free-form counter, exported as <namespace>_<counter>_total.
+        """
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + amount
+
+    def snapshot(self):
+        """
+        Return a copy of the stage data (with calls, mean_ms and items_per_sec added) and the counters.
+        """
+        with self._lock:
+            stages = {stage: dict(data, buckets=list(data["buckets"])) for stage, data in self._stages.items()}
+            counters = dict(self._counters)
+        for data in stages.values():
+            data["mean_ms"] = data["sum"] / data["count"] * 1000 if data["count"] else 0.0
+            data["items_per_sec"] = data["items"] / data["sum"] if data["sum"] else 0.0
+        return {"stages": stages, "counters": counters}
+
+    def log_summary(self):
+        """
+        Log one line per stage with its calls, items, errors and timings.
+        """
+        for stage, data in sorted(self.snapshot()["stages"].items()):
+            logging.info(f"Stage '{stage}': {data['count']} calls, {data['items']} items, {data['errors']} errors, "
+                         f"{data['sum']:.2f}s total, {data['mean_ms']:.2f} ms/call, "
+                         f"{data['items_per_sec']:.0f} items/sec.")
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+    def to_prometheus(self):
+        """
+        Render the metrics in the Prometheus text exposition format.
+        :return: String
+        """
+        snapshot = self.snapshot()
+        name = f"{self.namespace}_stage"
+        lines = [f"# HELP {name}_duration_seconds Time per call of each pipeline stage.",
+                 f"# TYPE {name}_duration_seconds histogram"]
+        for stage, data in sorted(snapshot["stages"].items()):
+            cumulative = 0
+            for bound, observed in zip(self.buckets, data["buckets"]):
+                cumulative += observed
+                lines.append(f'{name}_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_duration_seconds_bucket{{stage="{stage}",le="+Inf"}} {data["count"]}')
+            lines.append(f'{name}_duration_seconds_sum{{stage="{stage}"}} {data["sum"]}')
+            lines.append(f'{name}_duration_seconds_count{{stage="{stage}"}} {data["count"]}')
+        for field, description in (("items", "Items processed by each pipeline stage."),
+                                   ("errors", "Calls of each pipeline stage that raised an error.")):
+            lines.append(f"# HELP {name}_{field}_total {description}")
+            lines.append(f"# TYPE {name}_{field}_total counter")
+            for stage, data in sorted(snapshot["stages"].items()):
+                lines.append(f'{name}_{field}_total{{stage="{stage}"}} {data[field]}')
+        for counter, value in sorted(snapshot["counters"].items()):
+            lines.append(f"# TYPE {self.namespace}_{counter}_total counter")
+            lines.append(f"{self.namespace}_{counter}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """
+        Atomically write the metrics to a file in the Prometheus text format.
+        :param path: Output file (e.g. in node_exporter's textfile collector directory)
+        """
+        with open(path + ".tmp", "w") as file:
+            file.write(self.to_prometheus())
+        os.replace(path + ".tmp", path)
+
+    def serve(self, port, host=METRICS_HOST):
+        """
+        Serve the metrics on http://host:port/metrics from a background thread.
+        :return: The ThreadingHTTPServer (call shutdown() to stop it)
+        """
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        logging.info(f"Serving metrics on http://{host}:{port}/metrics")
+        return server
+
+    def start_profiling(self):
+        """
+        Start collecting a cProfile profile (no-op when one is already running).
+        """
+        if self._profiler is None:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+            logging.info("Profiling started.")
+
+    def stop_profiling(self, path=PROFILE_OUTPUT_PATH, top=20):
+        """
+        Stop profiling, write the stats for pstats/snakeviz and log the most expensive functions.
+        :param path: Output .pstats file
+        :param top: Number of functions to log, by cumulative time
+        """
+        if self._profiler is None:
+            return
+        self._profiler.disable()
+        profiler, self._profiler = self._profiler, None
+        profiler.dump_stats(path)
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(top)
+        logging.info(f"Profiling stopped; stats written to {path}.\n{summary.getvalue()}")
+
+    def toggle_profiling(self, *_):
+        """
+        Start profiling, or stop it and write the stats; usable as a signal handler.
+        """
+        if self._profiler is None:
+            self.start_profiling()
+        else:
+            self.stop_profiling()
+
+pipeline_metrics = PipelineMetrics(METRICS_NAMESPACE)
+
+def start_metrics_exporters():
+    """
+    Start the configured profiling, SIGUSR1 toggle, /metrics endpoint and exit-time file export.
+    Called from the main section only, so importing the script (including from worker processes, which
+    re-import it under the spawn start method) never binds the port or writes the metrics file.
+    """
+    if PROFILE_ENABLED:
+        pipeline_metrics.start_profiling()
+    if PROFILE_SIGNAL and hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGUSR1, pipeline_metrics.toggle_profiling)  # `kill -USR1 <pid>` toggles profiling
+    if METRICS_PORT:
+        pipeline_metrics.serve(METRICS_PORT)
+    if METRICS_EXPORT_PATH:
+        atexit.register(pipeline_metrics.write_prometheus, METRICS_EXPORT_PATH)
+
+# Started before the examples below run so they are profiled and exported; workers importing the script skip it
+if __name__ == "__main__":
+    start_metrics_exporters()
+
+# ---------------------------
+# Search Result Cache
+# ---------------------------
+# Search results keyed by a hash of the query vector bytes, filter, limit, profile and collection.
+# The module-level `search_cache` is consulted by the search functions when it is set. Every invalidation bumps
+# a generation counter; a search reads the generation before it runs and its result is only stored if the
+# generation is unchanged, so a search that overlapped a write cannot put a stale result back into the cache.
+
+class SearchResultCache:
+    """
+    Size-bounded LRU cache with per-entry TTL for search results.
+    :param max_entries: Maximum number of cached results before LRU eviction
+    :param ttl: Seconds an entry stays valid (None disables expiry)
+    """
+
+    def __init__(self, max_entries=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (collection_name, stored_at, hits)
+        self._generations = {}  # collection_name -> invalidation count
+        self._global_generation = 0  # Invalidations of all collections
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0,
+                         "stale_puts": 0, "hit_seconds": 0.0, "miss_seconds": 0.0}
+
+    @staticmethod
+    def make_key(query_vector, query_filter=None, limit=5, profile=COLLECTION_PROFILE,
+                 collection_name=COLLECTION_NAME):
+        """
+        Hash the inputs that determine a search result.
+        :return: Hex digest used as cache key
+        """
+        digest = hashlib.blake2b(np.ascontiguousarray(query_vector, dtype=np.float32).tobytes(), digest_size=16)
+        filter_json = query_filter.model_dump_json(exclude_none=True) if query_filter is not None else ""
+        digest.update(f"|{filter_json}|{limit}|{profile}|{collection_name}".encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Return the cached hits for a key, or None on a miss or expired entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self.ttl is not None and time.monotonic() - entry[1] > self.ttl:
+                del self._entries[key]
+                self.counters["expirations"] += 1
+                return None
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def generation(self, collection_name=COLLECTION_NAME):
+        """
+        Return the collection's current invalidation generation; read it before searching and pass it to put().
+        """
+        with self._lock:
+            return self._global_generation, self._generations.get(collection_name, 0)
+
+    def put(self, key, hits, collection_name=COLLECTION_NAME, generation=None):
+        """
+        Store search hits, evicting the least recently used entries beyond max_entries.
+        :param generation: Value of generation() taken before the search; the hits are dropped if the
+            collection was invalidated since
+        """
+        with self._lock:
+            if generation is not None and generation != (self._global_generation,
+                                                         self._generations.get(collection_name, 0)):
+                self.counters["stale_puts"] += 1
+                return
+            self._entries[key] = (collection_name, time.monotonic(), hits)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def record(self, hit, seconds):
+        """
+        Update hit/miss counters and their cumulative latency.
+        """
+        with self._lock:
+            self.counters["hits" if hit else "misses"] += 1
+            self.counters["hit_seconds" if hit else "miss_seconds"] += seconds
+
+    def invalidate(self, collection_name=None):
+        """
+        Drop cached results for one collection, or for all collections when collection_name is None.
+        """
+        with self._lock:
+            stale = [key for key, entry in self._entries.items()
+                     if collection_name is None or entry[0] == collection_name]
+            for key in stale:
+                del self._entries[key]
+            if collection_name is None:
+                self._global_generation += 1
+            else:
+                self._generations[collection_name] = self._generations.get(collection_name, 0) + 1
+            self.counters["invalidations"] += 1
+        if stale:
+            logging.info(f"Invalidated {len(stale)} cached searches for '{collection_name or 'all collections'}'.")
+
+    def stats(self):
+        """
+        Return counters plus hit rate, average hit/miss latency and current size.
+        """
+        with self._lock:
+            stats = dict(self.counters)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["avg_hit_ms"] = stats["hit_seconds"] / stats["hits"] * 1000 if stats["hits"] else 0.0
+        stats["avg_miss_ms"] = stats["miss_seconds"] / stats["misses"] * 1000 if stats["misses"] else 0.0
+        return stats
+
+search_cache = SearchResultCache() if SEARCH_CACHE_ENABLED else None
+
+def enable_search_cache(max_entries=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL):
+    """
+    Turn on the shared search result cache.
+    :return: SearchResultCache instance
+    """
+    global search_cache
+    search_cache = SearchResultCache(max_entries, ttl)
+    return search_cache
+
+def invalidate_search_cache(collection_name=COLLECTION_NAME):
+    """
+    Drop cached results for a collection after it was written to; a no-op when the cache is disabled.
+    """
+    if search_cache is not None:
+        search_cache.invalidate(collection_name)
+
+def create_collection(client, payload_indexes=PAYLOAD_INDEXES, profile=COLLECTION_PROFILE,
+                      collection_name=COLLECTION_NAME, recreate=RECREATE_COLLECTION):
     """
     Create a new collection in Qdrant.
     :param client: QdrantClient instance
+    :param payload_indexes: Payload index specs to create (see PAYLOAD_INDEXES)
+    :param profile: Name of the collection profile to apply (see COLLECTION_PROFILES)
+    :param collection_name: Collection to create
+    :param recreate: Drop and recreate the collection if it already exists; otherwise an existing collection keeps
+                     its data and is updated to the profile's settings and any missing payload indexes
     """
     try:
-        client.recreate_collection(
-            collection_name=COLLECTION_NAME,
-            vectors_config=models.VectorParams(size=VECTOR_SIZE, distance=models.Distance.COSINE),
-        )
-        logging.info(f"Created collection '{COLLECTION_NAME}'.")
+        if not recreate and client.collection_exists(collection_name):
+            client.update_collection(collection_name=collection_name, **collection_update_params(profile))
+            create_payload_indexes(client, payload_indexes, collection_name=collection_name)
+            logging.info(f"Collection '{collection_name}' already exists; kept its data and applied profile '{profile}'.")
+            return
+        client.recreate_collection(collection_name=collection_name, **collection_params(profile))
+        invalidate_search_cache(collection_name)
+        create_payload_indexes(client, payload_indexes, collection_name=collection_name)
+        logging.info(f"Created collection '{collection_name}'.")
     except Exception as e:
         logging.error(f"Error creating collection: {e}")
 
@@ -107,86 +560,1062 @@ def insert_vectors(client):
     :param client: QdrantClient instance
     """
     try:
-        vectors = np.random.rand(100, VECTOR_SIZE)
-        client.upsert(
-            collection_name=COLLECTION_NAME,
-            points=[
-                models.PointStruct(
-                    id=idx,
-                    vector=vector.tolist(),
-                    payload={"color": "red", "rand_number": idx % 10}
-                )
-                for idx, vector in enumerate(vectors)
-            ]
+        vectors = np.random.rand(100, VECTOR_SIZE).astype(np.float32)
+        rand_numbers = np.arange(len(vectors)) % 10
+        upload_vectors_bulk(
+            client,
+            vectors,
+            payload_columns={"color": np.full(len(vectors), "red"), "rand_number": rand_numbers},
         )
         logging.info(f"Inserted vectors into collection '{COLLECTION_NAME}'.")
     except Exception as e:
         logging.error(f"Error inserting vectors: {e}")
 
-def search_vectors(client):
+# ---------------------------
+# Collection Profiles
+# ---------------------------
+# Translate a named profile from COLLECTION_PROFILES into creation and search parameters, and measure
+# what each profile costs in recall and latency against exact brute-force results.
+
+def collection_params(profile=COLLECTION_PROFILE):
+    """
+    Build the create/recreate_collection arguments for a profile.
+    :param profile: Name of a profile in COLLECTION_PROFILES
+    :return: Dict with vectors_config, hnsw_config and quantization_config
+    """
+    settings = COLLECTION_PROFILES[profile]
+    quantization_config = None
+    if settings["quantization"] == "scalar":
+        quantization_config = models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    elif settings["quantization"] == "product":
+        quantization_config = models.ProductQuantization(
+            product=models.ProductQuantizationConfig(compression=models.CompressionRatio.X16, always_ram=True)
+        )
+    elif settings["quantization"] is not None:
+        raise ValueError(f"Unknown quantization '{settings['quantization']}' in profile '{profile}'")
+    return {
+        "vectors_config": models.VectorParams(
+            size=VECTOR_SIZE, distance=models.Distance.COSINE, on_disk=settings["on_disk"]
+        ),
+        "hnsw_config": models.HnswConfigDiff(m=settings["m"], ef_construct=settings["ef_construct"]),
+        "quantization_config": quantization_config,
+    }
+
+def collection_update_params(profile=COLLECTION_PROFILE):
+    """
+    Build the update_collection arguments that move an existing collection to a profile.
+    :param profile: Name of a profile in COLLECTION_PROFILES
+    :return: Dict with vectors_config, hnsw_config and quantization_config
+    """
+    params = collection_params(profile)
+    return {
+        # "" addresses the collection's unnamed default vector
+        "vectors_config": {"": models.VectorParamsDiff(on_disk=COLLECTION_PROFILES[profile]["on_disk"])},
+        "hnsw_config": params["hnsw_config"],
+        # Switching to a profile without quantization has to remove the collection's existing quantization
+        "quantization_config": params["quantization_config"] or models.Disabled.DISABLED,
+    }
+
+def search_params(profile=COLLECTION_PROFILE):
+    """
+    Build the search-time parameters for a profile.
+    :param profile: Name of a profile in COLLECTION_PROFILES
+    :return: models.SearchParams instance, or None when the profile uses server defaults
+    """
+    settings = COLLECTION_PROFILES[profile]
+    if settings["hnsw_ef"] is None and settings["quantization"] is None:
+        return None
+    quantization = None
+    if settings["quantization"] is not None:
+        # Re-score the quantized candidates with the original vectors to recover most of the lost recall
+        quantization = models.QuantizationSearchParams(rescore=True, oversampling=2.0)
+    return models.SearchParams(hnsw_ef=settings["hnsw_ef"], quantization=quantization)
+
+def profile_recall_report(client, profiles=None, num_points=20000, num_queries=200, k=10,
+                          collection_name="benchmark_collection"):
+    """
+    Compare recall@k and search latency of collection profiles against brute-force NumPy ground truth.
+    Note that the embedded local mode always searches exhaustively; run against a server for meaningful numbers.
+    :param client: QdrantClient instance
+    :param profiles: Profile names to measure; defaults to all of COLLECTION_PROFILES
+    :param num_points: Points to load into the benchmark collection
+    :param num_queries: Queries per profile
+    :param k: Number of neighbours compared
+    :param collection_name: Collection used for the benchmark (it is recreated per profile)
+    :return: List of dicts with profile, recall_at_k, p50_ms and p99_ms
+    """
+    vectors = np.random.rand(num_points, VECTOR_SIZE).astype(np.float32)
+    queries = np.random.rand(num_queries, VECTOR_SIZE).astype(np.float32)
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = (queries / np.linalg.norm(queries, axis=1, keepdims=True)) @ normalized.T
+    ground_truth = np.argsort(-scores, axis=1)[:, :k]
+    report = []
+    for profile in profiles or list(COLLECTION_PROFILES):
+        client.recreate_collection(collection_name=collection_name, **collection_params(profile))
+        upload_vectors_bulk(client, vectors, collection_name=collection_name)
+        params = search_params(profile)
+        latencies = []
+        hits_found = 0
+        for query, expected in zip(queries, ground_truth):
+            started = time.perf_counter()
+            hits = client.search(collection_name=collection_name, query_vector=query.tolist(),
+                                 search_params=params, limit=k)
+            latencies.append(time.perf_counter() - started)
+            hits_found += len({hit.id for hit in hits} & set(expected.tolist()))
+        report.append({
+            "profile": profile,
+            "recall_at_k": hits_found / (num_queries * k),
+            "p50_ms": float(np.percentile(latencies, 50) * 1000),
+            "p99_ms": float(np.percentile(latencies, 99) * 1000),
+        })
+        logging.info(f"Profile '{profile}': recall@{k} {report[-1]['recall_at_k']:.3f}, "
+                     f"p50 {report[-1]['p50_ms']:.2f} ms, p99 {report[-1]['p99_ms']:.2f} ms")
+    return report
+
+# ---------------------------
+# Payload Indexes
+# ---------------------------
+# Declarative payload indexes (see PAYLOAD_INDEXES) and a check for filter fields that have no index.
+
+def payload_index_schema(spec):
+    """
+    Translate a payload index spec into a Qdrant field schema.
+    :param spec: Dict with "field", "type" and optional type-specific settings
+    :return: models.PayloadSchemaType or index params instance
+    """
+    index_type = spec["type"]
+    if index_type == "integer":
+        return models.IntegerIndexParams(
+            type=models.IntegerIndexType.INTEGER,
+            range=spec.get("range", True),
+            lookup=spec.get("lookup", True),
+        )
+    if index_type == "keyword" and spec.get("is_tenant"):
+        return models.KeywordIndexParams(type=models.KeywordIndexType.KEYWORD, is_tenant=True)
+    return models.PayloadSchemaType(index_type)
+
+def create_payload_indexes(client, payload_indexes=PAYLOAD_INDEXES, collection_name=COLLECTION_NAME):
+    """
+    Create the payload indexes the collection does not have yet.
+    :param client: QdrantClient instance
+    :param payload_indexes: List of payload index specs
+    :param collection_name: Collection to index
+    """
+    existing = client.get_collection(collection_name).payload_schema or {}
+    for spec in payload_indexes or []:
+        if spec["field"] in existing:
+            continue
+        client.create_payload_index(
+            collection_name=collection_name,
+            field_name=spec["field"],
+            field_schema=payload_index_schema(spec),
+            wait=True,
+        )
+        logging.info(f"Created {spec['type']} payload index on '{spec['field']}' in '{collection_name}'.")
+
+def filter_fields(query_filter):
+    """
+    Collect the payload keys referenced by a filter, including nested filters.
+    :param query_filter: models.Filter instance or None
+    :return: Set of payload keys
+    """
+    fields = set()
+    if query_filter is None:
+        return fields
+    for clause in (query_filter.must, query_filter.should, query_filter.must_not):
+        if clause is None:
+            continue
+        for condition in clause if isinstance(clause, list) else [clause]:
+            if isinstance(condition, models.Filter):
+                fields |= filter_fields(condition)
+            elif isinstance(condition, models.NestedCondition):
+                fields.add(condition.nested.key)
+                fields |= {f"{condition.nested.key}[].{key}" for key in filter_fields(condition.nested.filter)}
+            elif getattr(condition, "key", None):
+                fields.add(condition.key)
+    return fields
+
+def find_unindexed_filter_fields(client, query_filters, collection_name=COLLECTION_NAME):
+    """
+    Report filter fields used by queries that have no payload index on the collection.
+    :param client: QdrantClient instance
+    :param query_filters: Iterable of models.Filter instances used by queries
+    :param collection_name: Collection the queries run against
+    :return: Dict of unindexed field name -> number of filters using it
+    """
+    indexed = set(client.get_collection(collection_name).payload_schema or {})
+    missing = {}
+    for query_filter in query_filters:
+        for field in filter_fields(query_filter) - indexed:
+            missing[field] = missing.get(field, 0) + 1
+    for field, count in sorted(missing.items(), key=lambda item: -item[1]):
+        logging.warning(f"Filter field '{field}' used by {count} queries has no payload index in '{collection_name}'.")
+    return missing
+
+def benchmark_filtered_search(client, num_points=20000, num_queries=200, thresholds=(1, 5, 9),
+                              payload_indexes=PAYLOAD_INDEXES, collection_name="benchmark_collection"):
+    """
+    Measure filtered-search latency before and after creating payload indexes.
+    Selectivity is controlled by the `rand_number >= threshold` filter: threshold t keeps (10 - t) / 10 of the points.
+    Note that the embedded local mode ignores payload indexes; run against a server for meaningful numbers.
+    :param client: QdrantClient instance
+    :param num_points: Points to load into the benchmark collection
+    :param num_queries: Searches per measurement
+    :param thresholds: rand_number thresholds to measure
+    :param payload_indexes: Index specs applied between the two runs
+    :param collection_name: Collection used for the benchmark (it is recreated)
+    :return: List of dicts with threshold, selectivity, unindexed_p50_ms and indexed_p50_ms
+    """
+    client.recreate_collection(
+        collection_name=collection_name,
+        vectors_config=models.VectorParams(size=VECTOR_SIZE, distance=models.Distance.COSINE),
+    )
+    upload_vectors_bulk(
+        client,
+        np.random.rand(num_points, VECTOR_SIZE).astype(np.float32),
+        payload_columns={"rand_number": np.arange(num_points) % 10},
+        collection_name=collection_name,
+    )
+    queries = np.random.rand(num_queries, VECTOR_SIZE).astype(np.float32)
+
+    def p50_ms(threshold):
+        latencies = []
+        for vector in queries:
+            started = time.perf_counter()
+            client.search(collection_name=collection_name, query_vector=vector.tolist(),
+                          query_filter=rand_number_filter(gte=threshold), limit=5)
+            latencies.append(time.perf_counter() - started)
+        return float(np.percentile(latencies, 50) * 1000)
+
+    unindexed = {threshold: p50_ms(threshold) for threshold in thresholds}
+    create_payload_indexes(client, payload_indexes, collection_name)
+    report = []
+    for threshold in thresholds:
+        report.append({
+            "threshold": threshold,
+            "selectivity": (10 - threshold) / 10,
+            "unindexed_p50_ms": unindexed[threshold],
+            "indexed_p50_ms": p50_ms(threshold),
+        })
+        logging.info(f"rand_number >= {threshold}: {report[-1]['unindexed_p50_ms']:.2f} ms unindexed, "
+                     f"{report[-1]['indexed_p50_ms']:.2f} ms indexed (p50)")
+    return report
+
+# ---------------------------
+# Bulk Upload
+# ---------------------------
+# Columnar upload path for large datasets. Vectors are read as a 2-D float32 array (or a memory-mapped
+# .npy file) and sent in fixed-size models.Batch upserts, so only one batch is ever held in memory.
+
+def load_vectors(source):
+    """
+    Load a 2-D float32 vector array without copying it into memory.
+    :param source: NumPy array or path to a .npy file (opened memory-mapped)
+    :return: 2-D array of shape (N, VECTOR_SIZE)
+    """
+    if isinstance(source, (str, os.PathLike)):
+        vectors = np.load(source, mmap_mode='r')
+    else:
+        vectors = np.asarray(source)
+    if vectors.ndim != 2 or vectors.shape[1] != VECTOR_SIZE:
+        raise ValueError(f"Expected an (N, {VECTOR_SIZE}) array, got shape {vectors.shape}")
+    return vectors
+
+def _column_slice(column, start, stop):
+    """
+    Return rows start:stop of a payload column as plain Python values.
+    """
+    part = column[start:stop]
+    return part.tolist() if isinstance(part, np.ndarray) else list(part)
+
+def iter_columnar_batches(vectors, payload_columns=None, ids=None, batch_size=UPLOAD_BATCH_SIZE, id_offset=0):
+    """
+    Yield columnar models.Batch objects over slices of the input arrays.
+    :param vectors: 2-D array of shape (N, VECTOR_SIZE)
+    :param payload_columns: Optional dict of payload field name -> array of length N
+    :param ids: Optional array of N point IDs; defaults to id_offset + row index
+    :param batch_size: Number of points per batch
+    :param id_offset: First point ID when ids is not given
+    :return: Generator of (start_row, models.Batch)
+    """
+    payload_columns = payload_columns or {}
+    total = len(vectors)
+    for name, column in payload_columns.items():
+        if len(column) != total:
+            raise ValueError(f"Payload column '{name}' has {len(column)} rows, expected {total}")
+    for start in range(0, total, batch_size):
+        stop = min(start + batch_size, total)
+        # Only this slice is converted; a memory-mapped source pages in just these rows.
+        chunk = np.ascontiguousarray(vectors[start:stop], dtype=np.float32)
+        if ids is None:
+            batch_ids = list(range(id_offset + start, id_offset + stop))
+        else:
+            batch_ids = np.asarray(ids[start:stop]).tolist()
+        payloads = None
+        if payload_columns:
+            names = list(payload_columns)
+            columns = [_column_slice(payload_columns[name], start, stop) for name in names]
+            # None marks a field the point does not have (e.g. columns read back from an export)
+            payloads = [{name: value for name, value in zip(names, row) if value is not None} for row in zip(*columns)]
+        yield start, models.Batch(ids=batch_ids, vectors=chunk.tolist(), payloads=payloads)
+
+def upload_vectors_bulk(client, source, payload_columns=None, ids=None, batch_size=UPLOAD_BATCH_SIZE,
+                        id_offset=0, collection_name=COLLECTION_NAME, wait=True):
+    """
+    Stream a large vector array into the collection in fixed-size columnar batches.
+    :param client: QdrantClient instance
+    :param source: 2-D float32 NumPy array or path to a .npy file
+    :param payload_columns: Optional dict of payload field name -> array of length N
+    :param ids: Optional array of N point IDs; defaults to id_offset + row index
+    :param batch_size: Number of points per upsert
+    :param id_offset: First point ID when ids is not given
+    :param collection_name: Target collection
+    :param wait: Wait for each upsert to be applied before sending the next one
+    :return: Number of points uploaded
+    """
+    vectors = load_vectors(source)
+    uploaded = 0
+    for _, batch in iter_columnar_batches(vectors, payload_columns, ids, batch_size, id_offset):
+        with pipeline_metrics.timed("upsert", len(batch.ids)):
+            client.upsert(collection_name=collection_name, points=batch, wait=wait)
+        uploaded += len(batch.ids)
+    invalidate_search_cache(collection_name)
+    logging.info(f"Bulk uploaded {uploaded} vectors into collection '{collection_name}'.")
+    return uploaded
+
+# ---------------------------
+# Incremental Sync
+# ---------------------------
+# Keeps a collection in step with a source dataset without re-uploading it. A local manifest stores a
+# 64-bit hash of every point's vector and payload; only new or changed points are upserted and points
+# that disappeared from the source are deleted. The manifest is only replaced after a successful sync, and it is
+# ignored when the collection's point count no longer matches it (e.g. after the collection was recreated).
+
+def _row_hashes(vectors, payload_columns, start, stop):
+    """
+    Hash the vector bytes and payload of rows start:stop.
+    :return: List of unsigned 64-bit integers
+    """
+    chunk = np.ascontiguousarray(vectors[start:stop], dtype=np.float32)
+    names = sorted(payload_columns or {})
+    columns = [_column_slice(payload_columns[name], start, stop) for name in names]
+    hashes = []
+    for row, vector in enumerate(chunk):
+        digest = hashlib.blake2b(vector.tobytes(), digest_size=8)
+        if names:
+            digest.update(json.dumps([column[row] for column in columns], default=str).encode())
+        hashes.append(int.from_bytes(digest.digest(), "little"))
+    return hashes
+
+def load_sync_manifest(manifest_path=SYNC_MANIFEST_PATH, collection_name=COLLECTION_NAME):
+    """
+    Read the point ID -> hash manifest written by sync_vectors.
+    :return: Dict of point ID -> hash (empty when there is no manifest for this collection)
+    """
+    if not os.path.exists(manifest_path):
+        return {}
+    with np.load(manifest_path, allow_pickle=False) as manifest:
+        if str(manifest["collection"]) != collection_name:
+            logging.warning(f"Sync manifest {manifest_path} belongs to '{manifest['collection']}'; ignoring it.")
+            return {}
+        return dict(zip(manifest["ids"].tolist(), manifest["hashes"].tolist()))
+
+def _write_sync_manifest(manifest_path, collection_name, ids, hashes):
+    """
+    Atomically replace the sync manifest.
+    """
+    tmp_path = manifest_path + ".tmp.npz"
+    np.savez(tmp_path, collection=np.array(collection_name), ids=np.asarray(ids),
+             hashes=np.asarray(hashes, dtype=np.uint64))
+    os.replace(tmp_path, manifest_path)
+
+def sync_vectors(client, source, ids=None, payload_columns=None, manifest_path=SYNC_MANIFEST_PATH,
+                 batch_size=UPLOAD_BATCH_SIZE, collection_name=COLLECTION_NAME):
+    """
+    Bring a collection in line with the source: upsert new or changed points and delete removed ones.
+    :param client: QdrantClient instance
+    :param source: 2-D float32 NumPy array or path to a .npy file holding the full source dataset
+    :param ids: Array of N point IDs; defaults to the row index
+    :param payload_columns: Optional dict of payload field name -> array of length N
+    :param manifest_path: Path of the local hash manifest
+    :param batch_size: Number of points per upsert or delete request
+    :param collection_name: Target collection (created with the active profile when missing)
+    :return: Dict with upserted, deleted, unchanged and seconds
+    """
+    started = time.perf_counter()
+    vectors = load_vectors(source)
+    total = len(vectors)
+    ids = list(range(total)) if ids is None else _column_slice(ids, 0, total)
+    previous = load_sync_manifest(manifest_path, collection_name)
+    if not client.collection_exists(collection_name):
+        client.create_collection(collection_name=collection_name, **collection_params(COLLECTION_PROFILE))
+        create_payload_indexes(client, PAYLOAD_INDEXES, collection_name)
+        previous = {}  # The manifest describes data that is no longer there
+    known = previous
+    if previous and client.count(collection_name=collection_name, exact=True).count != len(previous):
+        # The collection was recreated or changed outside of sync: re-upload every row, but still delete the
+        # manifest's ids that left the source
+        logging.warning(f"Collection '{collection_name}' does not match the sync manifest; re-uploading all points.")
+        known = {}
+
+    hashes = []
+    changed = []
+    for start in range(0, total, batch_size):
+        for row, row_hash in enumerate(_row_hashes(vectors, payload_columns, start, min(start + batch_size, total)),
+                                       start=start):
+            hashes.append(row_hash)
+            if known.get(ids[row]) != row_hash:
+                changed.append(row)
+
+    for start in range(0, len(changed), batch_size):
+        rows = np.asarray(changed[start:start + batch_size])
+        batch_columns = {name: [_column_slice(column, row, row + 1)[0] for row in rows]
+                         for name, column in (payload_columns or {}).items()}
+        for _, batch in iter_columnar_batches(vectors[rows], batch_columns, [ids[row] for row in rows], batch_size):
+            with pipeline_metrics.timed("upsert", len(batch.ids)):
+                client.upsert(collection_name=collection_name, points=batch, wait=True)
+
+    removed = list(previous.keys() - set(ids))
+    for start in range(0, len(removed), batch_size):
+        client.delete(collection_name=collection_name,
+                      points_selector=models.PointIdsList(points=removed[start:start + batch_size]), wait=True)
+
+    if changed or removed:
+        invalidate_search_cache(collection_name)
+    _write_sync_manifest(manifest_path, collection_name, ids, hashes)
+    stats = {"upserted": len(changed), "deleted": len(removed), "unchanged": total - len(changed),
+             "seconds": time.perf_counter() - started}
+    logging.info(f"Synced '{collection_name}': {stats['upserted']} upserted, {stats['deleted']} deleted, "
+                 f"{stats['unchanged']} unchanged in {stats['seconds']:.2f}s.")
+    return stats
+
+# ---------------------------
+# Collection Export
+# ---------------------------
+# Pages through a collection with scroll and writes the vectors to memory-mapped float32 .npy shards.
+# Each shard has a columnar JSON side file holding its point IDs and one list per payload field.
+# export_manifest.json records the finished shards and the scroll offset to continue from, so an
+# interrupted export resumes where it stopped. Memory use is bounded by one page plus one shard's metadata.
+EXPORT_MANIFEST = "export_manifest.json"
+
+def _write_export_manifest(output_dir, manifest):
+    """
+    Atomically write the export manifest.
+    """
+    path = os.path.join(output_dir, EXPORT_MANIFEST)
+    with open(path + ".tmp", "w") as file:
+        json.dump(manifest, file)
+    os.replace(path + ".tmp", path)
+
+def export_collection(client, output_dir, shard_size=EXPORT_SHARD_SIZE, page_size=EXPORT_PAGE_SIZE,
+                      collection_name=COLLECTION_NAME):
+    """
+    Export all points of a collection to .npy shards, resuming a previous export when possible.
+    :param client: QdrantClient instance
+    :param output_dir: Directory for the shards and the manifest
+    :param shard_size: Points per shard
+    :param page_size: Points fetched per scroll request
+    :param collection_name: Collection to export
+    :return: Export manifest dict
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, EXPORT_MANIFEST)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as file:
+            manifest = json.load(file)
+        if manifest["collection"] != collection_name:
+            raise ValueError(f"{output_dir} holds an export of '{manifest['collection']}', not '{collection_name}'")
+        if manifest["done"]:
+            logging.info(f"Export of '{collection_name}' in {output_dir} is already complete.")
+            return manifest
+        logging.info(f"Resuming export of '{collection_name}' after {len(manifest['shards'])} shards.")
+    else:
+        manifest = {"collection": collection_name, "vector_size": VECTOR_SIZE, "shards": [],
+                    "next_offset": None, "done": False}
+
+    offset = manifest["next_offset"]
+    while not manifest["done"]:
+        index = len(manifest["shards"])
+        vectors_file = f"vectors_{index:05d}.npy"
+        vectors_path = os.path.join(output_dir, vectors_file)
+        shard = np.lib.format.open_memmap(vectors_path, mode="w+", dtype=np.float32,
+                                          shape=(shard_size, VECTOR_SIZE))
+        ids, columns, filled = [], {}, 0
+        while filled < shard_size:
+            # Never read past the shard boundary, so the next offset is always a valid resume point
+            with pipeline_metrics.timed("fetch") as call:
+                points, offset = client.scroll(collection_name=collection_name, offset=offset,
+                                               limit=min(page_size, shard_size - filled),
+                                               with_payload=True, with_vectors=True)
+                call["items"] = len(points)
+            if points:
+                shard[filled:filled + len(points)] = np.asarray([point.vector for point in points], dtype=np.float32)
+                for row, point in enumerate(points, start=filled):
+                    ids.append(point.id)
+                    for field in (point.payload or {}):
+                        columns.setdefault(field, [None] * row)
+                    for field, values in columns.items():
+                        values.append((point.payload or {}).get(field))
+                filled += len(points)
+            if offset is None:
+                break
+        shard.flush()
+        del shard
+        if filled < shard_size:
+            # Trim the final, partial shard to the rows actually written
+            full = np.load(vectors_path, mmap_mode="r")
+            trimmed = np.lib.format.open_memmap(vectors_path + ".tmp", mode="w+", dtype=np.float32,
+                                                shape=(filled, VECTOR_SIZE))
+            trimmed[:] = full[:filled]
+            trimmed.flush()
+            del full, trimmed
+            os.replace(vectors_path + ".tmp", vectors_path)
+        if filled:
+            meta_file = f"meta_{index:05d}.json"
+            with open(os.path.join(output_dir, meta_file), "w") as file:
+                json.dump({"ids": ids, "payload": columns}, file)
+            manifest["shards"].append({"vectors": vectors_file, "meta": meta_file, "rows": filled})
+        else:
+            os.remove(vectors_path)
+        manifest["next_offset"] = offset
+        manifest["done"] = offset is None
+        _write_export_manifest(output_dir, manifest)
+        logging.info(f"Exported shard {index} ({filled} points) of '{collection_name}'.")
+    total = sum(shard["rows"] for shard in manifest["shards"])
+    logging.info(f"Exported {total} points of '{collection_name}' to {output_dir}.")
+    return manifest
+
+def import_exported_collection(client, export_dir, collection_name=COLLECTION_NAME, **upload_kwargs):
+    """
+    Load an export written by export_collection back into a collection through the bulk upload path.
+    :param client: QdrantClient instance
+    :param export_dir: Directory written by export_collection
+    :param collection_name: Target collection
+    :param upload_kwargs: Extra arguments for upload_vectors_bulk (e.g. batch_size)
+    :return: Number of points uploaded
+    """
+    with open(os.path.join(export_dir, EXPORT_MANIFEST)) as file:
+        manifest = json.load(file)
+    uploaded = 0
+    for shard in manifest["shards"]:
+        with open(os.path.join(export_dir, shard["meta"])) as file:
+            meta = json.load(file)
+        uploaded += upload_vectors_bulk(client, os.path.join(export_dir, shard["vectors"]),
+                                        payload_columns=meta["payload"], ids=meta["ids"],
+                                        collection_name=collection_name, **upload_kwargs)
+    return uploaded
+
+# ---------------------------
+# Parallel Ingestion
+# ---------------------------
+# Uploads columnar batches from a pool of worker threads. A bounded semaphore caps the number of
+# batches in flight, so the producer blocks instead of reading the whole input ahead of the uploads.
+# Point IDs are fixed per row, so a retried batch simply overwrites itself.
+# The embedded local mode (QdrantClient(path=...) or ":memory:") is not thread-safe, so its upserts are
+# serialised with a lock; remote clients upload concurrently.
+
+def _is_local_client(client):
+    """
+    Check whether a QdrantClient runs in embedded local mode.
+    :param client: QdrantClient instance
+    """
+    return type(getattr(client, "_client", None)).__name__ == "QdrantLocal"
+
+def _upsert_with_retry(client, collection_name, batch, max_retries, retry_backoff, client_lock=None):
+    """
+    Upsert one batch, retrying with exponential backoff.
+    :return: None on success, otherwise the last exception
+    """
+    for attempt in range(1, max_retries + 1):
+        try:
+            with pipeline_metrics.timed("upsert", len(batch.ids)):
+                if client_lock is None:
+                    client.upsert(collection_name=collection_name, points=batch, wait=True)
+                else:
+                    with client_lock:
+                        client.upsert(collection_name=collection_name, points=batch, wait=True)
+            return None
+        except Exception as e:
+            logging.warning(f"Upsert attempt {attempt}/{max_retries} failed: {e}")
+            if attempt == max_retries:
+                return e
+            time.sleep(retry_backoff * 2 ** (attempt - 1))
+
+def ingest_vectors_parallel(client, source, payload_columns=None, ids=None, batch_size=UPLOAD_BATCH_SIZE,
+                            workers=INGEST_WORKERS, max_in_flight=INGEST_MAX_IN_FLIGHT,
+                            max_retries=INGEST_MAX_RETRIES, retry_backoff=0.5,
+                            id_offset=0, collection_name=COLLECTION_NAME):
+    """
+    Upload a large vector array using a pool of worker threads with backpressure.
+    :param client: QdrantClient instance (shared by all workers)
+    :param source: 2-D float32 NumPy array or path to a .npy file
+    :param payload_columns: Optional dict of payload field name -> array of length N
+    :param ids: Optional array of N point IDs; defaults to id_offset + row index
+    :param batch_size: Number of points per upsert
+    :param workers: Number of upload threads
+    :param max_in_flight: Maximum batches queued or uploading at once
+    :param max_retries: Attempts per batch before giving up on it
+    :param retry_backoff: Initial delay in seconds between retries
+    :param id_offset: First point ID when ids is not given
+    :param collection_name: Target collection
+    :return: Dict with points, batches, failed_batches (start rows), seconds and points_per_sec
+    """
+    vectors = load_vectors(source)
+    in_flight = threading.BoundedSemaphore(max_in_flight)
+    lock = threading.Lock()
+    client_lock = threading.Lock() if _is_local_client(client) else None
+    stats = {"points": 0, "batches": 0, "failed_batches": []}
+
+    def upload(start, batch):
+        try:
+            error = _upsert_with_retry(client, collection_name, batch, max_retries, retry_backoff, client_lock)
+            with lock:
+                if error is None:
+                    stats["points"] += len(batch.ids)
+                    stats["batches"] += 1
+                else:
+                    stats["failed_batches"].append(start)
+                    logging.error(f"Batch starting at row {start} failed after {max_retries} attempts: {error}")
+        finally:
+            in_flight.release()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for start, batch in iter_columnar_batches(vectors, payload_columns, ids, batch_size, id_offset):
+            in_flight.acquire()  # Blocks the producer while max_in_flight batches are pending
+            executor.submit(upload, start, batch)
+    invalidate_search_cache(collection_name)
+    stats["seconds"] = time.perf_counter() - started
+    stats["points_per_sec"] = stats["points"] / stats["seconds"] if stats["seconds"] else 0.0
+    stats["failed_batches"].sort()
+    logging.info(f"Ingested {stats['points']} points into '{collection_name}' "
+                 f"at {stats['points_per_sec']:.0f} points/sec ({len(stats['failed_batches'])} failed batches).")
+    return stats
+
+def search_vectors(client, profile=COLLECTION_PROFILE):
     """
     Search for similar vectors in the collection.
     :param client: QdrantClient instance
+    :param profile: Name of the collection profile whose search settings are used
     :return: Search results
     """
     try:
         query_vector = np.random.rand(VECTOR_SIZE)
-        hits = client.search(
-            collection_name=COLLECTION_NAME,
-            query_vector=query_vector,
-            limit=5  # Return 5 closest points
-        )
-        logging.info("Performed vector search.")
+        with pipeline_metrics.timed("search", 1) as call:
+            hits = client.search(
+                collection_name=COLLECTION_NAME,
+                query_vector=query_vector,
+                search_params=search_params(profile),
+                limit=5  # Return 5 closest points
+            )
+        logging.info(f"Performed vector search: {len(hits)} hits in {call['seconds'] * 1000:.1f} ms.")
         return hits
     except Exception as e:
         logging.error(f"Error searching vectors: {e}")
 
-def search_vectors_with_filter(client):
+def rand_number_filter(gte=3):
+    """
+    Build the example payload filter used by the filtered searches.
+    :param gte: Lower bound for the `rand_number` payload field
+    :return: models.Filter instance
+    """
+    return models.Filter(
+        must=[  # These conditions are required for search results
+            models.FieldCondition(
+                key='rand_number',  # Condition based on values of `rand_number` field.
+                range=models.Range(
+                    gte=gte  # Select only those results where `rand_number` >= gte
+                )
+            )
+        ]
+    )
+
+def search_vectors_cached(client, query_vector, query_filter=None, limit=5, profile=COLLECTION_PROFILE,
+                          collection_name=COLLECTION_NAME):
+    """
+    Search for similar vectors, serving repeated queries from the shared search cache when it is enabled.
+    :param client: QdrantClient instance
+    :param query_vector: Query vector
+    :param query_filter: Optional models.Filter
+    :param limit: Number of hits to return
+    :param profile: Name of the collection profile whose search settings are used
+    :param collection_name: Collection to search
+    :return: Search results
+    """
+    cache = search_cache
+    started = time.perf_counter()
+    key = generation = None
+    if cache is not None:
+        key = cache.make_key(query_vector, query_filter, limit, profile, collection_name)
+        generation = cache.generation(collection_name)
+        hits = cache.get(key)
+        if hits is not None:
+            cache.record(True, time.perf_counter() - started)
+            pipeline_metrics.count("search_cache_hits")
+            return hits
+    with pipeline_metrics.timed("search", 1):
+        hits = client.search(
+            collection_name=collection_name,
+            query_vector=np.asarray(query_vector, dtype=np.float32).tolist(),
+            query_filter=query_filter,
+            search_params=search_params(profile),
+            limit=limit,
+        )
+    if cache is not None:
+        cache.put(key, hits, collection_name, generation)
+        cache.record(False, time.perf_counter() - started)
+    return hits
+
+def search_vectors_with_filter(client, profile=COLLECTION_PROFILE):
     """
     Search for similar vectors with filtering condition.
     :param client: QdrantClient instance
+    :param profile: Name of the collection profile whose search settings are used
     :return: Filtered search results
     """
     try:
         query_vector = np.random.rand(VECTOR_SIZE)
-        hits = client.search(
-            collection_name=COLLECTION_NAME,
-            query_vector=query_vector,
-            query_filter=models.Filter(
-                must=[  # These conditions are required for search results
-                    models.FieldCondition(
-                        key='rand_number',  # Condition based on values of `rand_number` field.
-                        range=models.Range(
-                            gte=3  # Select only those results where `rand_number` >= 3
-                        )
-                    )
-                ]
-            ),
-            limit=5  # Return 5 closest points
-        )
-        logging.info("Performed filtered vector search.")
+        with pipeline_metrics.timed("search", 1) as call:
+            hits = client.search(
+                collection_name=COLLECTION_NAME,
+                query_vector=query_vector,
+                query_filter=rand_number_filter(gte=3),
+                search_params=search_params(profile),
+                limit=5  # Return 5 closest points
+            )
+        logging.info(f"Performed filtered vector search: {len(hits)} hits in {call['seconds'] * 1000:.1f} ms.")
         return hits
     except Exception as e:
         logging.error(f"Error searching vectors with filter: {e}")
 
+# ---------------------------
+# Batched Search
+# ---------------------------
+# Sends many query vectors per round-trip using search_batch. Results come back in the same order
+# as the input rows. batch_size trades throughput (fewer requests) against the latency of each request.
+
+def search_vectors_batch(client, query_vectors, filters=None, limit=5, batch_size=SEARCH_BATCH_SIZE,
+                         profile=COLLECTION_PROFILE, collection_name=COLLECTION_NAME):
+    """
+    Search for similar vectors for every row of a query matrix.
+    :param client: QdrantClient instance
+    :param query_vectors: Array of shape (N, VECTOR_SIZE)
+    :param filters: None, a single models.Filter applied to every query, or a list of N filters (entries may be None)
+    :param limit: Number of hits per query
+    :param batch_size: Number of queries sent per request
+    :param profile: Name of the collection profile whose search settings are used
+    :param collection_name: Collection to search
+    :return: List of N hit lists, aligned with the input rows
+    """
+    query_vectors = np.asarray(query_vectors, dtype=np.float32)
+    if query_vectors.ndim != 2 or query_vectors.shape[1] != VECTOR_SIZE:
+        raise ValueError(f"Expected an (N, {VECTOR_SIZE}) query matrix, got shape {query_vectors.shape}")
+    total = len(query_vectors)
+    if filters is None or isinstance(filters, models.Filter):
+        filters = [filters] * total
+    elif len(filters) != total:
+        raise ValueError(f"Got {len(filters)} filters for {total} queries")
+    params = search_params(profile)
+    cache = search_cache
+    started_all = time.perf_counter()
+    results = [None] * total
+    pending = list(range(total))
+    if cache is not None:
+        keys = [cache.make_key(query_vectors[row], filters[row], limit, profile, collection_name) for row in pending]
+        generation = cache.generation(collection_name)
+        for row in range(total):
+            started = time.perf_counter()
+            results[row] = cache.get(keys[row])
+            if results[row] is not None:
+                cache.record(True, time.perf_counter() - started)
+                pipeline_metrics.count("search_cache_hits")
+        pending = [row for row in range(total) if results[row] is None]
+    for start in range(0, len(pending), batch_size):
+        rows = pending[start:start + batch_size]
+        requests = [
+            models.SearchRequest(vector=query_vectors[row].tolist(), filter=filters[row], params=params, limit=limit,
+                                 with_payload=True)
+            for row in rows
+        ]
+        with pipeline_metrics.timed("search", len(rows)) as call:
+            batch_hits = client.search_batch(collection_name=collection_name, requests=requests)
+        elapsed = call["seconds"]
+        for row, hits in zip(rows, batch_hits):
+            results[row] = hits
+            if cache is not None:
+                cache.put(keys[row], hits, collection_name, generation)
+                cache.record(False, elapsed / len(rows))
+    logging.info(f"Performed batched vector search for {total} queries ({total - len(pending)} from cache) "
+                 f"in {time.perf_counter() - started_all:.2f}s.")
+    return results
+
 # ---------------------------
 # Async Client Usage
 # ---------------------------
+# Asynchronous versions of the operations above, built on one shared AsyncQdrantClient whose HTTP
+# connection pool is reused by every coroutine. A semaphore caps concurrent requests, and uploads are
+# pipelined: the next batch is prepared while earlier ones are still in flight.
+_async_client = None
+
+def get_async_client(**client_kwargs):
+    """
+    Return the shared AsyncQdrantClient, creating it on first use.
+    :param client_kwargs: Arguments for AsyncQdrantClient; defaults to the configured HOST and PORT
+    :return: AsyncQdrantClient instance
+    """
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncQdrantClient(**(client_kwargs or {"url": f"http://{HOST}:{PORT}"}))
+        logging.info("Created shared async Qdrant client.")
+    return _async_client
+
+async def close_async_client():
+    """
+    Close the shared AsyncQdrantClient and release its connections.
+    """
+    global _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+        logging.info("Closed shared async Qdrant client.")
+
+async def async_create_collection(async_client, payload_indexes=PAYLOAD_INDEXES, profile=COLLECTION_PROFILE,
+                                  collection_name=COLLECTION_NAME, recreate=RECREATE_COLLECTION):
+    """
+    Create a new collection in Qdrant.
+    :param async_client: AsyncQdrantClient instance
+    :param payload_indexes: Payload index specs to create (see PAYLOAD_INDEXES)
+    :param profile: Name of the collection profile to apply (see COLLECTION_PROFILES)
+    :param collection_name: Collection to create
+    :param recreate: Drop and recreate the collection if it already exists; otherwise an existing collection keeps
+                     its data and is updated to the profile's settings and any missing payload indexes
+    """
+    try:
+        if not recreate and await async_client.collection_exists(collection_name):
+            await async_client.update_collection(collection_name=collection_name, **collection_update_params(profile))
+            existing = (await async_client.get_collection(collection_name)).payload_schema or {}
+            payload_indexes = [spec for spec in payload_indexes or [] if spec["field"] not in existing]
+            action = f"Collection '{collection_name}' already exists; kept its data and applied profile '{profile}'."
+        else:
+            await async_client.recreate_collection(collection_name=collection_name, **collection_params(profile))
+            invalidate_search_cache(collection_name)
+            action = f"Created collection '{collection_name}'."
+        for spec in payload_indexes or []:
+            await async_client.create_payload_index(
+                collection_name=collection_name,
+                field_name=spec["field"],
+                field_schema=payload_index_schema(spec),
+                wait=True,
+            )
+        logging.info(action)
+    except Exception as e:
+        logging.error(f"Error creating collection: {e}")
+
+async def async_insert_vectors(async_client, source, payload_columns=None, ids=None, batch_size=UPLOAD_BATCH_SIZE,
+                               concurrency=ASYNC_MAX_CONCURRENCY, id_offset=0, collection_name=COLLECTION_NAME):
+    """
+    Upload a vector array with up to `concurrency` columnar batches in flight.
+    :param async_client: AsyncQdrantClient instance
+    :param source: 2-D float32 NumPy array or path to a .npy file
+    :param payload_columns: Optional dict of payload field name -> array of length N
+    :param ids: Optional array of N point IDs; defaults to id_offset + row index
+    :param batch_size: Number of points per upsert
+    :param concurrency: Maximum batches uploading at once
+    :param id_offset: First point ID when ids is not given
+    :param collection_name: Target collection
+    :return: Dict with points, batches, failed_batches (start rows), seconds and points_per_sec
+    """
+    vectors = load_vectors(source)
+    semaphore = asyncio.Semaphore(concurrency)
+    stats = {"points": 0, "batches": 0, "failed_batches": []}
+
+    async def upload(start, batch):
+        try:
+            with pipeline_metrics.timed("upsert", len(batch.ids)):
+                await async_client.upsert(collection_name=collection_name, points=batch, wait=True)
+            stats["points"] += len(batch.ids)
+            stats["batches"] += 1
+        except Exception as e:
+            # A failed batch is reported and the remaining batches keep uploading
+            stats["failed_batches"].append(start)
+            logging.error(f"Batch starting at row {start} failed: {e}")
+        finally:
+            semaphore.release()
+
+    started = time.perf_counter()
+    tasks = []
+    try:
+        for start, batch in iter_columnar_batches(vectors, payload_columns, ids, batch_size, id_offset):
+            await semaphore.acquire()  # Waits here while `concurrency` batches are uploading
+            tasks.append(asyncio.create_task(upload(start, batch)))
+        await asyncio.gather(*tasks)
+    except BaseException:
+        # Do not leave uploads running unobserved when batching fails or the caller is cancelled
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    finally:
+        invalidate_search_cache(collection_name)
+    stats["seconds"] = time.perf_counter() - started
+    stats["points_per_sec"] = stats["points"] / stats["seconds"] if stats["seconds"] else 0.0
+    stats["failed_batches"].sort()
+    logging.info(f"Inserted {stats['points']} vectors into collection '{collection_name}' "
+                 f"at {stats['points_per_sec']:.0f} points/sec ({len(stats['failed_batches'])} failed batches).")
+    return stats
+
+async def async_search_vectors(async_client, query_vector=None, query_filter=None, limit=5, semaphore=None,
+                               profile=COLLECTION_PROFILE, collection_name=COLLECTION_NAME):
+    """
+    Search for similar vectors in the collection.
+    :param async_client: AsyncQdrantClient instance
+    :param query_vector: Query vector; a random one is used when omitted
+    :param query_filter: Optional models.Filter
+    :param limit: Number of hits to return
+    :param semaphore: Optional asyncio.Semaphore shared by concurrent searches
+    :param profile: Name of the collection profile whose search settings are used
+    :param collection_name: Collection to search
+    :return: Search results
+    """
+    if query_vector is None:
+        query_vector = np.random.rand(VECTOR_SIZE)
+    cache = search_cache
+    started = time.perf_counter()
+    if cache is not None:
+        key = cache.make_key(query_vector, query_filter, limit, profile, collection_name)
+        generation = cache.generation(collection_name)
+        hits = cache.get(key)
+        if hits is not None:
+            cache.record(True, time.perf_counter() - started)
+            pipeline_metrics.count("search_cache_hits")
+            return hits
+    search = async_client.search(
+        collection_name=collection_name,
+        query_vector=np.asarray(query_vector, dtype=np.float32).tolist(),
+        query_filter=query_filter,
+        search_params=search_params(profile),
+        limit=limit,
+    )
+    if semaphore is None:
+        with pipeline_metrics.timed("search", 1):
+            hits = await search
+    else:
+        async with semaphore:
+            with pipeline_metrics.timed("search", 1):
+                hits = await search
+    if cache is not None:
+        cache.put(key, hits, collection_name, generation)
+        cache.record(False, time.perf_counter() - started)
+    return hits
+
+async def async_search_vectors_with_filter(async_client, query_vector=None, limit=5, semaphore=None,
+                                           profile=COLLECTION_PROFILE, collection_name=COLLECTION_NAME):
+    """
+    Search for similar vectors with filtering condition.
+    :param async_client: AsyncQdrantClient instance
+    :param query_vector: Query vector; a random one is used when omitted
+    :param limit: Number of hits to return
+    :param semaphore: Optional asyncio.Semaphore shared by concurrent searches
+    :param profile: Name of the collection profile whose search settings are used
+    :param collection_name: Collection to search
+    :return: Filtered search results
+    """
+    return await async_search_vectors(async_client, query_vector, rand_number_filter(gte=3), limit, semaphore,
+                                      profile, collection_name)
+
+async def async_search_many(async_client, query_vectors, query_filter=None, limit=5,
+                            concurrency=ASYNC_MAX_CONCURRENCY, profile=COLLECTION_PROFILE,
+                            collection_name=COLLECTION_NAME):
+    """
+    Run one search per query row concurrently, with at most `concurrency` requests in flight.
+    :param async_client: AsyncQdrantClient instance
+    :param query_vectors: Array of shape (N, VECTOR_SIZE)
+    :param query_filter: Optional models.Filter applied to every query
+    :param limit: Number of hits per query
+    :param concurrency: Maximum searches in flight
+    :param profile: Name of the collection profile whose search settings are used
+    :param collection_name: Collection to search
+    :return: List of N hit lists, aligned with the input rows
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(*(
+        async_search_vectors(async_client, vector, query_filter, limit, semaphore, profile, collection_name)
+        for vector in np.asarray(query_vectors, dtype=np.float32)
+    ))
+
+def benchmark_sync_vs_async(client, async_client, num_points=10000, num_queries=1000,
+                            concurrency_levels=(1, 4, 16, 64), profile=COLLECTION_PROFILE,
+                            collection_name="benchmark_collection"):
+    """
+    Compare search throughput of the sync client (thread pool) and the async client (semaphore)
+    at several concurrency levels. Both clients are loaded with the same random data first.
+    :param client: QdrantClient instance
+    :param async_client: AsyncQdrantClient instance
+    :param num_points: Points to load into the collection
+    :param num_queries: Searches issued per measurement
+    :param concurrency_levels: Concurrency levels to measure
+    :param profile: Name of the collection profile used to create and search the collection on both sides
+    :param collection_name: Collection used for the benchmark (it is recreated)
+    :return: List of dicts with concurrency, sync_qps and async_qps
+    """
+    vectors = np.random.rand(num_points, VECTOR_SIZE).astype(np.float32)
+    queries = np.random.rand(num_queries, VECTOR_SIZE).astype(np.float32)
+    client.recreate_collection(collection_name=collection_name, **collection_params(profile))
+    upload_vectors_bulk(client, vectors, collection_name=collection_name)
+
+    async def load_and_measure():
+        await async_create_collection(async_client, profile=profile, collection_name=collection_name, recreate=True)
+        await async_insert_vectors(async_client, vectors, collection_name=collection_name)
+        timings = {}
+        for concurrency in concurrency_levels:
+            started = time.perf_counter()
+            await async_search_many(async_client, queries, concurrency=concurrency, profile=profile,
+                                    collection_name=collection_name)
+            timings[concurrency] = time.perf_counter() - started
+        return timings
+
+    async_timings = asyncio.run(load_and_measure())
+    params = search_params(profile)
+    report = []
+    for concurrency in concurrency_levels:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(
+                lambda vector: client.search(collection_name=collection_name, query_vector=vector.tolist(),
+                                             search_params=params, limit=5),
+                queries,
+            ))
+        sync_seconds = time.perf_counter() - started
+        report.append({
+            "concurrency": concurrency,
+            "sync_qps": num_queries / sync_seconds,
+            "async_qps": num_queries / async_timings[concurrency],
+        })
+        logging.info(f"Concurrency {concurrency}: sync {report[-1]['sync_qps']:.0f} q/s, "
+                     f"async {report[-1]['async_qps']:.0f} q/s")
+    return report
+
 # Uncomment the following lines to use the asynchronous version of QdrantClient
 # async def main():
-#     async_client = AsyncQdrantClient(url=f"http://{HOST}:{PORT}")
-#     await async_client.create_collection(
-#         collection_name=COLLECTION_NAME,
-#         vectors_config=models.VectorParams(size=VECTOR_SIZE, distance=models.Distance.COSINE),
-#     )
-#     # Include other async operations here
-#     # ...
+#     async_client = get_async_client()
+#     await async_create_collection(async_client)
+#     vectors = np.random.rand(10000, VECTOR_SIZE).astype(np.float32)
+#     # The same payload as insert_vectors, so async_search_vectors_with_filter has points to match
+#     await async_insert_vectors(async_client, vectors, payload_columns={
+#         "color": np.full(len(vectors), "red"), "rand_number": np.arange(len(vectors)) % 10})
+#     hits = await async_search_many(async_client, np.random.rand(100, VECTOR_SIZE))
+#     filtered_hits = await async_search_vectors_with_filter(async_client)
 #     logging.info("Async operations completed.")
-#     await async_client.close()
+#     await close_async_client()
 
 #     # Uncomment the line below to run the async main function
 #     # asyncio.run(main())
 
+# Uncomment to compare sync and async search throughput (uses its own benchmark collection)
+# report = benchmark_sync_vs_async(client, AsyncQdrantClient(url=f"http://{HOST}:{PORT}"))
+
 # ---------------------------
 # Further Resources
 # ---------------------------
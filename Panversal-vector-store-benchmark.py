@@ -0,0 +1,401 @@
+"""
+Vector Store Benchmark Harness
+
+Drives the two integration templates in this repo on the same datasets so they can be compared with numbers:
+
+1. Qdrant (local mode): create_collection, the bulk upload used by insert_vectors, and the search call made by
+   search_vectors, with the template's collection profile settings.
+2. ChromaDB: a cosine collection on the template's client, collection.add in ADD_BATCH_SIZE batches, and
+   query_collection.
+
+For every dataset and backend it reports ingest throughput, single-query latency percentiles (p50/p95/p99),
+recall@k against exact brute-force NumPy results, and peak resident memory. Each backend runs in its own
+process so peak memory is not shared between them. Results are written as JSON so runs can be compared over
+time to catch regressions.
+
+Datasets:
+- Synthetic: normally distributed float32 vectors (--synthetic N, --dimensions D).
+- Real: a .npy or .fvecs file of base vectors (--dataset), e.g. the SIFT/GloVe sets from ann-benchmarks, with an
+  optional matching query file (--dataset-queries). Without a query file, queries are held out from the base set.
+
+Usage:
+python Panversal-vector-store-benchmark.py --synthetic 100000 --dimensions 128 --output benchmark_results.json
+python Panversal-vector-store-benchmark.py --dataset sift_base.fvecs --dataset-queries sift_query.fvecs --k 10
+
+Both templates are loaded by path with importlib, since their file names are not importable module names.
+The harness keeps everything it writes in a working directory (--workdir, a temporary directory by default):
+the saved datasets, the Qdrant local-mode store, and the Chroma persistent store (the template's CHROMA_PERSIST_PATH
+is pointed there before its client is first created). Each backend also runs with the working directory as its
+current directory, so any relative default path a template writes to when used (embedding cache, manifests,
+metrics export) ends up there too, never in the real project's files.
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; peak RSS is reported as null there
+    resource = None
+
+# ---------------------------
+# Logging Setup
+# ---------------------------
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# ---------------------------
+# Configuration Section
+# ---------------------------
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATES = {
+    "qdrant": os.path.join(REPO_DIR, "Panversal-QDrantDB-client-integration.py"),
+    "chroma": os.path.join(REPO_DIR, "Panversal-ChromaDB-client-integration.py"),
+}
+BENCHMARK_COLLECTION = "benchmark_collection"
+DEFAULT_K = 10
+DEFAULT_NUM_QUERIES = 1000
+WARMUP_QUERIES = 10  # Untimed queries run first so one-off setup costs do not land in the percentiles
+GROUND_TRUTH_BLOCK = 256  # Queries scored per brute-force block; bounds the score matrix to block x N floats
+RESULTS_PATH = "benchmark_results.json"
+
+# ---------------------------
+# Datasets
+# ---------------------------
+
+def read_fvecs(path):
+    """
+    Read an .fvecs file (each row: int32 dimension followed by that many float32 values).
+    :param path: Path to the file
+    :return: 2-D float32 array
+    """
+    raw = np.fromfile(path, dtype=np.int32)
+    if raw.size == 0:
+        return np.zeros((0, 0), dtype=np.float32)
+    dimensions = raw[0]
+    return raw.reshape(-1, dimensions + 1)[:, 1:].view(np.float32).copy()
+
+def read_vectors(path):
+    """
+    Read a .npy or .fvecs file of vectors.
+    :param path: Path to the file
+    :return: 2-D float32 array
+    """
+    if path.endswith(".fvecs"):
+        return read_fvecs(path)
+    return np.load(path, mmap_mode="r").astype(np.float32)
+
+def synthetic_dataset(num_points, num_queries=DEFAULT_NUM_QUERIES, dimensions=128, seed=0):
+    """
+    Generate normally distributed base and query vectors.
+    :param num_points: Base vectors
+    :param num_queries: Query vectors
+    :param dimensions: Vector dimensions
+    :param seed: Random seed, so repeated runs measure the same data
+    :return: Dict with name, vectors and queries
+    """
+    rng = np.random.default_rng(seed)
+    return {
+        "name": f"synthetic-{num_points}x{dimensions}",
+        "vectors": rng.standard_normal((num_points, dimensions), dtype=np.float32),
+        "queries": rng.standard_normal((num_queries, dimensions), dtype=np.float32),
+    }
+
+def file_dataset(path, queries_path=None, num_queries=DEFAULT_NUM_QUERIES, seed=0):
+    """
+    Load a real dataset from disk. Without a query file, num_queries rows are held out of the base set.
+    :param path: .npy or .fvecs file of base vectors
+    :param queries_path: Optional .npy or .fvecs file of query vectors
+    :param num_queries: Queries to use (held out, or the first rows of the query file)
+    :param seed: Random seed for choosing held-out rows
+    :return: Dict with name, vectors and queries
+    """
+    vectors = read_vectors(path)
+    if queries_path:
+        queries = read_vectors(queries_path)[:num_queries]
+    else:
+        held_out = np.random.default_rng(seed).choice(len(vectors), size=num_queries, replace=False)
+        queries = vectors[held_out]
+        vectors = np.delete(vectors, held_out, axis=0)
+    return {"name": os.path.splitext(os.path.basename(path))[0], "vectors": vectors, "queries": queries}
+
+def brute_force_neighbours(vectors, queries, k):
+    """
+    Exact top-k cosine neighbours, the ground truth for recall.
+    :param vectors: 2-D array of base vectors
+    :param queries: 2-D array of query vectors
+    :param k: Neighbours per query
+    :return: (num_queries, k) array of row indices, best first
+    """
+    normalized = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    neighbours = []
+    for start in range(0, len(queries), GROUND_TRUTH_BLOCK):
+        block = queries[start:start + GROUND_TRUTH_BLOCK]
+        scores = (block / np.maximum(np.linalg.norm(block, axis=1, keepdims=True), 1e-12)) @ normalized.T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+        neighbours.append(np.take_along_axis(top, order, axis=1))
+    return np.vstack(neighbours)
+
+# ---------------------------
+# Measurements
+# ---------------------------
+
+def load_template(name):
+    """
+    Load one of the integration templates by path.
+    :param name: Key of TEMPLATES
+    :return: The loaded module
+    """
+    spec = importlib.util.spec_from_file_location(f"{name}_template", TEMPLATES[name])
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process so far.
+    :return: Megabytes, or None where the resource module is unavailable
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def latency_summary(latencies):
+    """
+    Summarise per-query latencies.
+    :param latencies: List of seconds
+    :return: Dict with p50_ms, p95_ms, p99_ms and mean_ms
+    """
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return {"p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99),
+            "mean_ms": float(np.mean(latencies) * 1000)}
+
+def recall_at_k(found_ids, ground_truth, k):
+    """
+    Fraction of the exact top-k neighbours that a backend returned.
+    :param found_ids: One list of row indices per query
+    :param ground_truth: (num_queries, k) array from brute_force_neighbours
+    :param k: Neighbours per query
+    :return: Recall in [0, 1]
+    """
+    hits = sum(len(set(found) & set(expected[:k].tolist())) for found, expected in zip(found_ids, ground_truth))
+    return hits / (len(ground_truth) * k)
+
+# ---------------------------
+# Backends
+# ---------------------------
+# Each runner ingests the vectors (row index = point id) and then times one query at a time.
+# They return the ingest time, per-query latencies and the row indices found for each query.
+
+def run_qdrant(vectors, queries, k, workdir):
+    """
+    Ingest and query through the Qdrant template against an embedded local-mode client.
+    :param vectors: 2-D float32 array of base vectors
+    :param queries: 2-D float32 array of query vectors
+    :param k: Neighbours per query
+    :param workdir: Directory for the local-mode store
+    :return: Dict with ingest_seconds, latencies and found_ids
+    """
+    from qdrant_client import QdrantClient
+    template = load_template("qdrant")
+    template.VECTOR_SIZE = vectors.shape[1]
+    client = QdrantClient(path=os.path.join(workdir, "qdrant_local"))
+    started = time.perf_counter()
+    template.create_collection(client, collection_name=BENCHMARK_COLLECTION, recreate=True)
+    if not client.collection_exists(BENCHMARK_COLLECTION):
+        raise RuntimeError("Qdrant create_collection failed; see the log above")
+    template.upload_vectors_bulk(client, vectors, collection_name=BENCHMARK_COLLECTION)
+    ingest_seconds = time.perf_counter() - started
+    params = template.search_params()
+
+    def search(query):
+        hits = client.search(collection_name=BENCHMARK_COLLECTION, query_vector=query.tolist(),
+                             search_params=params, limit=k)
+        return [hit.id for hit in hits]
+
+    result = {"ingest_seconds": ingest_seconds, **time_queries(search, queries)}
+    client.close()
+    return result
+
+def run_chroma(vectors, queries, k, workdir):
+    """
+    Ingest and query through the Chroma template's client with precomputed embeddings.
+    :param vectors: 2-D float32 array of base vectors
+    :param queries: 2-D float32 array of query vectors
+    :param k: Neighbours per query
+    :param workdir: Directory for the persistent store (the template's CHROMA_PERSIST_PATH)
+    :return: Dict with ingest_seconds, latencies and found_ids
+    """
+    os.environ["CHROMA_PERSIST_PATH"] = os.path.join(workdir, "chroma_data")
+    template = load_template("chroma")
+    client = template.get_chroma_client()
+    if BENCHMARK_COLLECTION in [getattr(existing, "name", existing) for existing in client.list_collections()]:
+        client.delete_collection(BENCHMARK_COLLECTION)
+    started = time.perf_counter()
+    # Cosine space to match the Qdrant profile; embeddings are passed in, so no embedding function is needed
+    bench_collection = client.get_or_create_collection(BENCHMARK_COLLECTION, metadata={"hnsw:space": "cosine"},
+                                                       embedding_function=None)
+    for start in range(0, len(vectors), template.ADD_BATCH_SIZE):
+        stop = min(start + template.ADD_BATCH_SIZE, len(vectors))
+        bench_collection.add(ids=[str(row) for row in range(start, stop)],
+                             embeddings=np.ascontiguousarray(vectors[start:stop]))
+    ingest_seconds = time.perf_counter() - started
+
+    def search(query):
+        results = template.query_collection(bench_collection, query_embeddings=[query], n_results=k, batch_size=1,
+                                            include=("distances",))
+        return [int(point_id) for point_id in results[0]["ids"]]
+
+    return {"ingest_seconds": ingest_seconds, **time_queries(search, queries)}
+
+BACKENDS = {"qdrant": run_qdrant, "chroma": run_chroma}
+
+def time_queries(search, queries):
+    """
+    Run queries one at a time, timing each.
+    :param search: Callable taking one query vector and returning the found row indices
+    :param queries: 2-D array of query vectors
+    :return: Dict with latencies (seconds) and found_ids
+    """
+    for query in queries[:WARMUP_QUERIES]:
+        search(query)
+    latencies, found_ids = [], []
+    for query in queries:
+        started = time.perf_counter()
+        found = search(query)
+        latencies.append(time.perf_counter() - started)
+        found_ids.append(found)
+    return {"latencies": latencies, "found_ids": found_ids}
+
+def measure_backend(backend, dataset_dir, k, workdir):
+    """
+    Run one backend on a dataset saved by run_benchmark and summarise it. Runs in a child process.
+    :param backend: Key of BACKENDS
+    :param dataset_dir: Directory holding vectors.npy, queries.npy and ground_truth.npy
+    :param k: Neighbours per query
+    :param workdir: Working directory for the backend's local files
+    :return: Dict of metrics
+    """
+    logging.getLogger().setLevel(logging.WARNING)  # The templates log every batch and search
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+    vectors = np.load(os.path.join(dataset_dir, "vectors.npy"), mmap_mode="r")
+    queries = np.load(os.path.join(dataset_dir, "queries.npy"))
+    ground_truth = np.load(os.path.join(dataset_dir, "ground_truth.npy"))
+    run = BACKENDS[backend](vectors, queries, k, workdir)
+    return {
+        "backend": backend,
+        "ingest_seconds": run["ingest_seconds"],
+        "ingest_points_per_sec": len(vectors) / run["ingest_seconds"],
+        **latency_summary(run["latencies"]),
+        f"recall_at_{k}": recall_at_k(run["found_ids"], ground_truth, k),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+# ---------------------------
+# Benchmark Runner
+# ---------------------------
+
+def package_versions():
+    """
+    Versions of the interpreter and libraries under test, recorded with each run.
+    :return: Dict of name -> version (None when not installed)
+    """
+    versions = {"python": platform.python_version(), "numpy": np.__version__}
+    for package in ("qdrant_client", "chromadb"):
+        try:
+            from importlib.metadata import version
+            versions[package] = version(package.replace("_", "-"))
+        except Exception:
+            versions[package] = None
+    return versions
+
+def run_benchmark(datasets, backends=tuple(BACKENDS), k=DEFAULT_K, workdir=None, isolate=True):
+    """
+    Benchmark every backend on every dataset.
+    :param datasets: List of dicts from synthetic_dataset / file_dataset
+    :param backends: Backend names to run
+    :param k: Neighbours per query for search and recall
+    :param workdir: Directory for datasets and backend stores (a temporary directory when omitted)
+    :param isolate: Run each backend in a fresh process so peak RSS is measured per backend
+    :return: Dict with run metadata and a result per dataset and backend
+    """
+    root = workdir or tempfile.mkdtemp(prefix="vector_benchmark_")
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "platform": platform.platform(),
+        "versions": package_versions(),
+        "k": k,
+        "results": [],
+    }
+    context = multiprocessing.get_context("spawn")
+    for dataset in datasets:
+        dataset_dir = os.path.join(root, dataset["name"])
+        shutil.rmtree(dataset_dir, ignore_errors=True)
+        os.makedirs(dataset_dir)
+        np.save(os.path.join(dataset_dir, "vectors.npy"), np.ascontiguousarray(dataset["vectors"], dtype=np.float32))
+        np.save(os.path.join(dataset_dir, "queries.npy"), np.ascontiguousarray(dataset["queries"], dtype=np.float32))
+        started = time.perf_counter()
+        ground_truth = brute_force_neighbours(dataset["vectors"], dataset["queries"], k)
+        logging.info(f"{dataset['name']}: brute-force ground truth in {time.perf_counter() - started:.1f}s")
+        np.save(os.path.join(dataset_dir, "ground_truth.npy"), ground_truth)
+        for backend in backends:
+            args = (backend, dataset_dir, k, os.path.join(dataset_dir, backend))
+            if isolate:
+                with context.Pool(1) as pool:
+                    result = pool.apply(measure_backend, args)
+            else:
+                cwd = os.getcwd()
+                try:
+                    result = measure_backend(*args)
+                finally:
+                    os.chdir(cwd)
+            result.update({"dataset": dataset["name"], "num_points": len(dataset["vectors"]),
+                           "num_queries": len(dataset["queries"]), "dimensions": dataset["vectors"].shape[1]})
+            report["results"].append(result)
+            logging.info(f"{dataset['name']} / {backend}: {result['ingest_points_per_sec']:.0f} points/s ingest, "
+                         f"p50 {result['p50_ms']:.2f} ms, p95 {result['p95_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms, "
+                         f"recall@{k} {result[f'recall_at_{k}']:.3f}, peak RSS {result['peak_rss_mb']} MB")
+    if not workdir:
+        shutil.rmtree(root, ignore_errors=True)
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Qdrant and Chroma templates on the same datasets.")
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=list(BACKENDS))
+    parser.add_argument("--synthetic", type=int, nargs="*", default=None,
+                        help="sizes of synthetic datasets to run (default 10000 when no --dataset is given)")
+    parser.add_argument("--dimensions", type=int, default=128, help="dimensions of the synthetic datasets")
+    parser.add_argument("--dataset", action="append", default=[], help=".npy or .fvecs file of base vectors")
+    parser.add_argument("--dataset-queries", action="append", default=[],
+                        help=".npy or .fvecs query file for the --dataset at the same position")
+    parser.add_argument("--queries", type=int, default=DEFAULT_NUM_QUERIES, help="queries per dataset")
+    parser.add_argument("--k", type=int, default=DEFAULT_K)
+    parser.add_argument("--workdir", help="keep datasets and stores here instead of a temporary directory")
+    parser.add_argument("--no-isolation", action="store_true",
+                        help="run backends in this process (faster, but peak RSS is then cumulative)")
+    parser.add_argument("--output", default=RESULTS_PATH, help="JSON results file")
+    args = parser.parse_args()
+
+    sizes = args.synthetic if args.synthetic is not None else ([] if args.dataset else [10000])
+    datasets = [synthetic_dataset(size, args.queries, args.dimensions) for size in sizes]
+    for position, path in enumerate(args.dataset):
+        queries_path = args.dataset_queries[position] if position < len(args.dataset_queries) else None
+        datasets.append(file_dataset(path, queries_path, args.queries))
+    report = run_benchmark(datasets, args.backends, args.k, args.workdir, isolate=not args.no_isolation)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    logging.info(f"Wrote {len(report['results'])} results to {args.output}")
@@ -1,9 +1,23 @@
 # Be sure to triple check any libraries you're not familiar with and update this script accordingly prior to running.
 
+import argparse
+import hashlib
+import importlib.metadata
+import json
+import os
+import platform
 import subprocess
-import pkg_resources
 import logging
+import re
 import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from packaging.requirements import Requirement
+except ImportError:  # packaging is not installed on its own, but pip always vendors a copy
+    from pip._vendor.packaging.requirements import Requirement
 
 # Initialize logging
 logging.basicConfig(filename='library_installation.log', level=logging.INFO,
@@ -20,13 +34,29 @@ libraries_to_install = [
     'peewee', 'django', 'pony'
 ]
 
-# Add any specific version requirements or alternative package names here
+# Add any specific version requirements or alternative package names here, as pip requirement strings
+# (e.g. 'numpy': 'numpy>=1.24'). The same requirement is used to check what is installed and to install it.
 libraries_versions = {
-    'torch': 'pytorch',
     'opencv': 'opencv-python',
     # Add any special handling for alternative package names or specific versions
 }
 
+# Import names that differ from the distribution name on PyPI
+import_aliases = {
+    'sklearn': 'scikit-learn',
+    'cv2': 'opencv-python',
+    'pytorch': 'torch',
+    'torch_geometric': 'torch-geometric',
+    'yaml': 'PyYAML',
+    'PIL': 'Pillow',
+}
+
+# Wheelhouse for network-less builds: prefetch once with network access, then install offline from it
+WHEELHOUSE_DIR = 'wheelhouse'
+WHEELHOUSE_MANIFEST = 'manifest.json'  # Stored inside the wheelhouse, records the requirements and file hashes
+WHEELHOUSE_LOCKFILE = 'requirements.lock'  # Stored inside the wheelhouse, used with pip --require-hashes
+PREFETCH_WORKERS = 4
+
 # Some libraries require system-level installation or additional setup
 system_level_libraries = {
     'graphviz': 'May require system-level installation. Please check Graphviz documentation.',
@@ -37,32 +67,39 @@ system_level_libraries = {
     'pyspark': 'May require installation of Java and Spark on the system.'
 }
 
+# Installed distributions, scanned once with importlib.metadata and rescanned after pip installs
+_installed_distributions = None
+
 def run_pip_command(command):
+    global _installed_distributions
     try:
         result = subprocess.run([sys.executable, '-m', 'pip'] + command, capture_output=True, text=True)
+        if command[0] == 'install':
+            # Anything pip installed (including dependencies) must show up in the next scan
+            _installed_distributions = None
         return result
     except subprocess.CalledProcessError as e:
         logging.error(f"Command '{' '.join(command)}' failed with error: {e.output}")
         return None
 
 def install_library(library):
-    library_cmd = libraries_versions.get(library, library)
+    library_cmd = str(library_requirement(library))
     result = run_pip_command(['install', library_cmd])
     if result and result.returncode == 0:
         logging.info(f"Successfully installed {library}.")
-        return True
     else:
         error_output = result.stderr if result else 'Unknown error during pip command execution.'
         logging.error(f"Error installing {library}: {error_output}")
-        return False
+    return result
 
-def troubleshoot_issue(library):
+def troubleshoot_issue(library, result):
+    # Act on the output of the install that already failed instead of running the same install again
     logging.info(f"Attempting to troubleshoot installation issue for {library}")
-    result = run_pip_command(['install', library])
-    if result and 'Permission denied' in result.stderr:
+    error_output = result.stderr if result else ''
+    if 'Permission denied' in error_output:
         logging.info(f"Permission issue detected when installing {library}. Retrying with elevated privileges.")
-        return run_pip_command(['install', '--user', library])
-    elif result and 'not found' in result.stderr:
+        return run_pip_command(['install', '--user', str(library_requirement(library))])
+    elif 'not found' in error_output or 'No matching distribution' in error_output:
         logging.info(f"Package {library} not found. Checking for typos or alternative package names.")
         return None
     else:
@@ -73,17 +110,47 @@ def handle_system_level_installation(library):
         logging.warning(system_level_libraries[library])
         # Manual system-level installation steps are required
 
-def check_install_library(library):
+def normalize_name(name):
+    # PEP 503 normalisation, so 'ann_visualizer', 'Ann-Visualizer' and 'ann.visualizer' compare equal
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+def installed_distributions(refresh=False):
+    global _installed_distributions
+    if _installed_distributions is None or refresh:
+        _installed_distributions = {}
+        for distribution in importlib.metadata.distributions():
+            name = distribution.metadata['Name']
+            if name:
+                _installed_distributions.setdefault(normalize_name(name), distribution.version)
+    return _installed_distributions
+
+def library_requirement(library):
+    name = import_aliases.get(library, library)
+    return Requirement(libraries_versions.get(library, libraries_versions.get(name, name)))
+
+def is_installed(library, refresh=False):
+    requirement = library_requirement(library)
+    version = installed_distributions(refresh).get(normalize_name(requirement.name))
+    if version is None:
+        return False
+    if requirement.specifier and not requirement.specifier.contains(version, prereleases=True):
+        logging.info(f"{library} {version} is installed but does not satisfy '{requirement}'.")
+        return False
+    return True
+
+def check_install_library(library, failed_result=None):
+    # failed_result: output of an install of this library that already failed (e.g. in a batch), to troubleshoot
+    # directly instead of installing it again
     handle_system_level_installation(library)
     try:
-        pkg_resources.get_distribution(library)
-        logging.info(f"{library} is already installed.")
-        return True
-    except pkg_resources.DistributionNotFound:
-        if install_library(library):
+        if is_installed(library):
+            logging.info(f"{library} is already installed.")
+            return True
+        result = failed_result or install_library(library)
+        if result and result.returncode == 0:
             return True
         else:
-            result = troubleshoot_issue(library)
+            result = troubleshoot_issue(library, result)
             if result and result.returncode == 0:
                 logging.info(f"Successfully installed {library} after troubleshooting.")
                 return True
@@ -95,13 +162,358 @@ def check_install_library(library):
         logging.error(f"Unexpected error when checking/installing {library}. Error: {e}")
         return False
 
-def main():
-    for library in libraries_to_install:
-        if not check_install_library(library):
-            logging.error(f"Final failure installing {library}. Please check the logs for detailed error information and possible solutions.")
+def unique_libraries(libraries):
+    # Drop duplicate entries (e.g. django is listed twice) while keeping the original order
+    seen = set()
+    return [library for library in libraries if not (library in seen or seen.add(library))]
+
+def find_missing_libraries(libraries, refresh=False):
+    # One scan of the installed distributions answers the question for the whole list
+    installed_distributions(refresh)
+    return [library for library in unique_libraries(libraries) if not is_installed(library)]
+
+def benchmark_detection(libraries):
+    # Compare the importlib.metadata scan with the previous per-library pkg_resources lookups
+    started = time.perf_counter()
+    missing = find_missing_libraries(libraries, refresh=True)
+    metadata_seconds = time.perf_counter() - started
+    summary = f"importlib.metadata: {len(missing)} missing found in {metadata_seconds * 1000:.1f} ms"
+    try:
+        started = time.perf_counter()
+        import pkg_resources
+        for library in unique_libraries(libraries):
+            try:
+                pkg_resources.get_distribution(library)
+            except pkg_resources.DistributionNotFound:
+                pass
+        summary += f"; pkg_resources import + lookups: {(time.perf_counter() - started) * 1000:.1f} ms"
+    except ImportError:
+        summary += "; pkg_resources is not available for comparison"
+    logging.info(summary)
+    print(summary)
+
+# pip error lines that name the requirement they failed on
+PIP_FAILURE_PATTERNS = [
+    re.compile(r"Could not find a version that satisfies the requirement ([A-Za-z0-9._-]+)"),
+    re.compile(r"No matching distribution found for ([A-Za-z0-9._-]+)"),
+    re.compile(r"Failed (?:to build|building wheel for) ([A-Za-z0-9._-]+)"),
+]
+
+def failing_libraries(libraries, error_output):
+    # Libraries from the batch that pip's error output names as the cause of the failure
+    named = {normalize_name(match) for pattern in PIP_FAILURE_PATTERNS for match in pattern.findall(error_output or '')}
+    return [library for library in libraries if normalize_name(library_requirement(library).name) in named]
+
+def install_requirements(libraries):
+    # Install the libraries in as few pip runs as possible. Returns the libraries that cannot be installed together
+    # with the rest, each with the output of the pip run that failed on it. A failed run installs nothing, so the
+    # batch is retried without the libraries pip names as failing; when pip names none of them (e.g. a dependency
+    # failed), the batch is split in half instead.
+    if not libraries:
+        return {}
+    install_names = [str(library_requirement(library)) for library in libraries]
+    logging.info(f"Installing {len(libraries)} libraries in one pip run: {' '.join(install_names)}")
+    result = run_pip_command(['install'] + install_names)
+    if result and result.returncode == 0:
+        logging.info(f"Successfully installed {', '.join(libraries)}.")
+        return {}
+    error_output = result.stderr if result else 'Unknown error during pip command execution.'
+    if len(libraries) == 1:
+        logging.error(f"Error installing {libraries[0]}: {error_output}")
+        return {libraries[0]: result}
+    failing = failing_libraries(libraries, error_output)
+    if failing and len(failing) < len(libraries):
+        logging.error(f"Batch install failed on {', '.join(failing)}; retrying without them.")
+        failed = dict.fromkeys(failing, result)
+        failed.update(install_requirements([library for library in libraries if library not in failing]))
+        return failed
+    logging.error(f"Batch install of {len(libraries)} libraries failed; splitting it. Error: {error_output}")
+    middle = len(libraries) // 2
+    failed = install_requirements(libraries[:middle])
+    failed.update(install_requirements(libraries[middle:]))
+    return failed
+
+def install_libraries_batch(libraries):
+    # Install every missing library with a single pip resolver run, then troubleshoot only the libraries that
+    # failed in the batch, using the pip output they already failed with rather than installing them again.
+    libraries = unique_libraries(libraries)
+    for library in libraries:
+        handle_system_level_installation(library)
+    missing = find_missing_libraries(libraries)
+    for library in libraries:
+        if library not in missing:
+            logging.info(f"{library} is already installed.")
+    failing = install_requirements(missing)
+    if failing:
+        logging.error(f"Troubleshooting the libraries that failed in the batch: {', '.join(failing)}.")
+    return [library for library, result in failing.items() if not check_install_library(library, result)]
+
+def compare_install_modes(libraries):
+    # Time the pip runs of both install paths with --dry-run --ignore-installed, as on a fresh environment and
+    # without changing anything: one resolver run for the whole list against one run per library. Requirements
+    # that fail on their own are reported and left out, since a run that stops at the first error times nothing.
+    # A first pass over every library finds those and also warms pip's cache, so both timed paths start equal.
+    install_names = [str(library_requirement(library)) for library in unique_libraries(libraries)]
+    dry_run = ['install', '--dry-run', '--ignore-installed', '--quiet']
+
+    def dry_run_ok(names):
+        result = run_pip_command(dry_run + names)
+        return bool(result and result.returncode == 0)
+
+    failing = [name for name in install_names if not dry_run_ok([name])]
+    if failing:
+        logging.error(f"Left out of the comparison because they cannot be installed: {', '.join(failing)}")
+    install_names = [name for name in install_names if name not in failing]
+    if not install_names:
+        print("Nothing to compare: no library in the list can be installed.")
+        return
+    started = time.perf_counter()
+    batch_ok = dry_run_ok(install_names)
+    batch_seconds = time.perf_counter() - started
+    if not batch_ok:
+        summary = (f"The {len(install_names)} installable libraries conflict when resolved together; "
+                   f"a batch install would fall back to smaller batches, so there is no single-run timing to compare.")
+    else:
+        started = time.perf_counter()
+        for name in install_names:
+            run_pip_command(dry_run + [name])
+        sequential_seconds = time.perf_counter() - started
+        summary = (f"Dry run of {len(install_names)} libraries: batch {batch_seconds:.1f}s in 1 pip run, "
+                   f"sequential {sequential_seconds:.1f}s in {len(install_names)} pip runs "
+                   f"({sequential_seconds / batch_seconds:.1f}x)")
+    if failing:
+        summary += f"; {len(failing)} left out: {', '.join(failing)}"
+    logging.info(summary)
+    print(summary)
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def wheelhouse_key(libraries, index_args):
+    # Identifies what a wheelhouse was built for: the requirement strings, the index options and the interpreter
+    requirements = sorted(str(library_requirement(library)) for library in unique_libraries(libraries))
+    payload = json.dumps([requirements, list(index_args), wheelhouse_target()])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def wheelhouse_target():
+    # The interpreter and platform the wheels are built for; an offline install elsewhere cannot use them
+    return {'python': f"{sys.version_info[0]}.{sys.version_info[1]}", 'platform': sys.platform,
+            'machine': platform.machine()}
+
+def load_wheelhouse_manifest(wheelhouse=WHEELHOUSE_DIR):
+    try:
+        with open(os.path.join(wheelhouse, WHEELHOUSE_MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def verify_wheelhouse(wheelhouse=WHEELHOUSE_DIR, manifest=None):
+    # Every file recorded in the manifest must still be present with the same sha256
+    manifest = manifest or load_wheelhouse_manifest(wheelhouse)
+    if not manifest:
+        return False
+    for filename, sha256 in manifest['files'].items():
+        path = os.path.join(wheelhouse, filename)
+        if not os.path.exists(path) or file_sha256(path) != sha256:
+            logging.warning(f"Wheelhouse file {filename} is missing or does not match the manifest hash.")
+            return False
+    return True
+
+def write_wheelhouse_manifest(libraries, index_args, wheels, wheelhouse=WHEELHOUSE_DIR, unresolvable=()):
+    # Lock and manifest cover exactly the resolved pins, never other files left in the wheelhouse by earlier runs.
+    # The key covers the requested list including unresolvable libraries, so a repeat prefetch of the same list
+    # is recognised; 'libraries' lists only those the wheelhouse can install.
+    files = {filename: file_sha256(os.path.join(wheelhouse, filename)) for filename in wheels.values()}
+    with open(os.path.join(wheelhouse, WHEELHOUSE_LOCKFILE), 'w') as f:
+        for pin, filename in sorted(wheels.items()):
+            f.write(f"{pin} --hash=sha256:{files[filename]}\n")
+    manifest = {'key': wheelhouse_key(list(libraries) + list(unresolvable), index_args),
+                'libraries': unique_libraries(libraries), 'unresolvable': list(unresolvable),
+                'target': wheelhouse_target(), 'pins': sorted(wheels), 'wheels': dict(sorted(wheels.items())),
+                'files': files}
+    with open(os.path.join(wheelhouse, WHEELHOUSE_MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def resolve_libraries(libraries, index_args=()):
+    # One resolver run for the whole library list, so every shared dependency gets a single version that satisfies
+    # all of them. --ignore-installed makes the report list the full set, not just what this machine lacks.
+    install_names = [str(library_requirement(library)) for library in libraries]
+    with tempfile.TemporaryDirectory() as scratch:
+        report_path = os.path.join(scratch, 'report.json')
+        result = run_pip_command(['install', '--dry-run', '--ignore-installed', '--quiet', '--report', report_path]
+                                 + install_names + list(index_args))
+        if not (result and result.returncode == 0):
+            error_output = result.stderr if result else 'Unknown error during pip command execution.'
+            logging.error(f"Could not resolve the library list. Error: {error_output}")
+            return None
+        with open(report_path) as f:
+            report = json.load(f)
+    return [f"{item['metadata']['name']}=={item['metadata']['version']}" for item in report['install']]
+
+def resolve_resolvable(libraries, index_args=(), workers=PREFETCH_WORKERS):
+    # Resolve the list in one run; if that fails, resolve each library on its own to find the ones that cannot be
+    # resolved, then resolve the rest together so one broken library does not block the whole wheelhouse.
+    # Returns the resolvable libraries, their pins and the libraries left out.
+    pins = resolve_libraries(libraries, index_args)
+    if pins is not None:
+        return libraries, pins, []
+    logging.info(f"Resolving {len(libraries)} libraries one at a time to find the ones that fail.")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        single = list(executor.map(lambda library: resolve_libraries([library], index_args), libraries))
+    unresolvable = [library for library, library_pins in zip(libraries, single) if library_pins is None]
+    resolvable = [library for library in libraries if library not in unresolvable]
+    if unresolvable:
+        logging.error(f"Could not resolve {', '.join(unresolvable)}; leaving them out of the wheelhouse.")
+    if not resolvable:
+        return [], [], libraries
+    pins = resolve_libraries(resolvable, index_args)
+    if pins is None:
+        # Each library resolves on its own, but not together; there is no single consistent set to lock
+        logging.error("The remaining libraries resolve individually but conflict with each other.")
+        return [], [], libraries
+    return resolvable, pins, unresolvable
+
+def build_wheel(pin, wheelhouse, index_args):
+    # pip wheel builds any sdist now, while build dependencies can still be fetched, so the offline install only
+    # ever sees wheels. Each worker builds into its own directory so concurrent pip runs never share files.
+    with tempfile.TemporaryDirectory(dir=wheelhouse) as target:
+        result = run_pip_command(['wheel', '--no-deps', '--wheel-dir', target, pin] + list(index_args))
+        built = [filename for filename in os.listdir(target) if filename.endswith('.whl')] if result else []
+        if not (result and result.returncode == 0 and len(built) == 1):
+            error_output = result.stderr if result else 'Unknown error during pip command execution.'
+            logging.error(f"Error building a wheel for {pin}: {error_output}")
+            return None
+        # Replacing is atomic, and also repairs files that no longer matched the manifest
+        os.replace(os.path.join(target, built[0]), os.path.join(wheelhouse, built[0]))
+    logging.info(f"Added {built[0]} to the wheelhouse.")
+    return built[0]
+
+def reusable_wheels(pins, wheelhouse, manifest):
+    # Wheels an earlier prefetch recorded for these exact pins whose files still match their hashes
+    reusable = {}
+    for pin in pins:
+        filename = ((manifest or {}).get('wheels') or {}).get(pin)
+        path = os.path.join(wheelhouse, filename) if filename else None
+        if path and os.path.exists(path) and file_sha256(path) == manifest['files'].get(filename):
+            reusable[pin] = filename
+    return reusable
+
+def prefetch_wheelhouse(libraries, wheelhouse=WHEELHOUSE_DIR, index_args=(), workers=PREFETCH_WORKERS):
+    # Resolve the whole library list once, then fetch (and if needed build) a wheel for every resolved pin in
+    # parallel. A wheelhouse whose manifest matches the same library list and index options, and whose files still
+    # match their hashes, is reused without any pip run; otherwise pins whose wheel is already there are not fetched
+    # again. Libraries that cannot be resolved are recorded in the manifest and reported, while the rest are still
+    # prefetched; delete the manifest to try resolving them again.
+    libraries = unique_libraries(libraries)
+    manifest = load_wheelhouse_manifest(wheelhouse)
+    if manifest and manifest['key'] == wheelhouse_key(libraries, index_args) and verify_wheelhouse(wheelhouse, manifest):
+        logging.info(f"Wheelhouse {wheelhouse} is up to date with {len(manifest['files'])} files, skipping download.")
+        unresolvable = manifest.get('unresolvable', [])
+        if unresolvable:
+            logging.error(f"Wheelhouse {wheelhouse} was prefetched without {', '.join(unresolvable)}, which could "
+                          f"not be resolved; delete {WHEELHOUSE_MANIFEST} to try again.")
+        return unresolvable
+    resolvable, pins, unresolvable = resolve_resolvable(libraries, index_args, workers)
+    if not pins:
+        return unresolvable
+    logging.info(f"Resolved {len(resolvable)} libraries to {len(pins)} pinned packages.")
+    os.makedirs(wheelhouse, exist_ok=True)
+    wheels = reusable_wheels(pins, wheelhouse, manifest)
+    if wheels:
+        logging.info(f"Reusing {len(wheels)} wheels already in {wheelhouse}.")
+    fetch = [pin for pin in pins if pin not in wheels]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        wheels.update(zip(fetch, executor.map(lambda pin: build_wheel(pin, wheelhouse, index_args), fetch)))
+    failures = [pin for pin in fetch if wheels[pin] is None]
+    if failures:
+        # Leave the manifest out so the next run retries instead of trusting an incomplete wheelhouse
+        logging.error(f"Could not fetch {', '.join(failures)}; the wheelhouse manifest was not written.")
+        return failures + unresolvable
+    manifest = write_wheelhouse_manifest(resolvable, index_args, wheels, wheelhouse, unresolvable)
+    logging.info(f"Wheelhouse {wheelhouse} prefetched with {len(manifest['files'])} wheels.")
+    return unresolvable
+
+def install_libraries_offline(libraries, wheelhouse=WHEELHOUSE_DIR):
+    # Install from the wheelhouse only (--no-index), pinned to the hashes recorded when it was prefetched
+    libraries = unique_libraries(libraries)
+    missing = find_missing_libraries(libraries)
+    if not missing:
+        logging.info("All libraries are already installed, skipping the offline install.")
+        return []
+    manifest = load_wheelhouse_manifest(wheelhouse)
+    if not manifest or not verify_wheelhouse(wheelhouse, manifest):
+        logging.error(f"Wheelhouse {wheelhouse} has no valid manifest. Run with --mode prefetch first.")
+        return missing
+    if manifest.get('target', wheelhouse_target()) != wheelhouse_target():
+        logging.error(f"Wheelhouse {wheelhouse} was prefetched for {manifest['target']} but this is "
+                      f"{wheelhouse_target()}. Run --mode prefetch with the same Python version on the same platform.")
+        return missing
+    unknown = [library for library in missing if library not in manifest['libraries']]
+    if unknown:
+        logging.error(f"Wheelhouse {wheelhouse} was not prefetched for {', '.join(unknown)}.")
+    if len(unknown) < len(missing):
+        logging.info(f"Installing {len(missing) - len(unknown)} libraries offline from {wheelhouse}.")
+        # --require-hashes pins the whole dependency set to the lock file written by the prefetch
+        result = run_pip_command(['install', '--no-index', '--find-links', wheelhouse, '--require-hashes',
+                                  '-r', os.path.join(wheelhouse, WHEELHOUSE_LOCKFILE)])
+        if not (result and result.returncode == 0):
+            error_output = result.stderr if result else 'Unknown error during pip command execution.'
+            logging.error(f"Offline install failed. Error: {error_output}")
+    return find_missing_libraries(missing, refresh=True)
+
+def install_libraries_sequential(libraries):
+    return [library for library in libraries if not check_install_library(library)]
+
+def main(mode='batch', wheelhouse=WHEELHOUSE_DIR, index_args=()):
+    started = time.perf_counter()
+    if mode == 'prefetch':
+        failures = prefetch_wheelhouse(libraries_to_install, wheelhouse, index_args)
+    elif mode == 'offline':
+        failures = install_libraries_offline(libraries_to_install, wheelhouse)
+    elif mode == 'batch':
+        failures = install_libraries_batch(libraries_to_install)
+    else:
+        failures = install_libraries_sequential(libraries_to_install)
+    for library in failures:
+        logging.error(f"Final failure installing {library}. Please check the logs for detailed error information and possible solutions.")
+    elapsed = time.perf_counter() - started
+    # Use --compare to time the batch and sequential paths against each other without installing anything
+    summary = f"{mode.capitalize()} {'run' if mode == 'prefetch' else 'install'} of {len(unique_libraries(libraries_to_install))} libraries finished in {elapsed:.1f}s with {len(failures)} failures."
+    logging.info(summary)
+    print(summary)
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Check and install the data science libraries.")
+    parser.add_argument('--mode', choices=['batch', 'sequential', 'prefetch', 'offline'], default='batch',
+                        help="batch: one pip resolver run for all missing libraries (default); "
+                             "sequential: one pip run per library; "
+                             "prefetch: resolve once and fetch wheels for everything into the wheelhouse in parallel; "
+                             "offline: install from the wheelhouse without network access")
+    parser.add_argument('--wheelhouse', default=WHEELHOUSE_DIR, help="wheelhouse directory for prefetch/offline")
+    parser.add_argument('--index-url', help="package index to prefetch from")
+    parser.add_argument('--find-links', help="local directory (or URL) of packages to prefetch from, "
+                                             "used without any index")
+    parser.add_argument('--benchmark-detection', action='store_true',
+                        help="only time how long detecting the installed libraries takes")
+    parser.add_argument('--compare', action='store_true',
+                        help="only time a dry run of the batch install against the per-library loop")
+    args = parser.parse_args()
+    if args.benchmark_detection:
+        benchmark_detection(libraries_to_install)
+    elif args.compare:
+        compare_install_modes(libraries_to_install)
+    else:
+        index_args = []
+        if args.index_url:
+            index_args += ['--index-url', args.index_url]
+        if args.find_links:
+            index_args += ['--find-links', args.find_links] + ([] if args.index_url else ['--no-index'])
+        main(args.mode, args.wheelhouse, index_args)
 
 ## This script contains the complete logic for checking, installing, and troubleshooting the installation of the libraries specified. 
 ## Keep in mind that for some libraries, especially those requiring system-level installations or additional setup (like graphviz), 